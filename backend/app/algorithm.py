@@ -13,22 +13,95 @@ TODO: Implement full DP algorithm in Issue #8 (Nico Naran)
 """
 
 import logging
-from typing import List, Tuple
+import threading
+from typing import Container, Iterable, Iterator, List, Tuple
+import numba
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from numba import njit, prange
 
 logger = logging.getLogger(__name__)
 
+# TLC LocationIDs fit in 9 bits, so a (pickup, dropoff) pair packs into one key
+ZONE_ID_BITS = 9
+ZONE_ID_LIMIT = 1 << ZONE_ID_BITS
+
+# Below this many rows a single np.bincount sweep beats the parallel kernel,
+# whose per-thread histograms cost more to zero and sum than to fill
+BINCOUNT_MAX_ROWS = 131072
+
+# Wider non-negative IDs still pack two to an int64 key (pickup in the high
+# 32 bits), which np.unique can count without building a hash table
+PAIR_SHIFT = 32
+WIDE_ID_LIMIT = 1 << 31
+
+# Uploads run in the threadpool and in background jobs, so the parallel kernel
+# can be called from several threads at once. Numba's workqueue threading
+# layer (the fallback without tbb/OpenMP) aborts the process on concurrent
+# launches, so every call goes through this lock
+_KERNEL_LOCK = threading.Lock()
+
+
+@njit(parallel=True, cache=True, boundscheck=False)
+def _count_pairs(
+    pickup: np.ndarray,
+    dropoff: np.ndarray,
+    n_threads: int,
+) -> np.ndarray:
+    """
+    Histogram packed (pickup, dropoff) keys in parallel.
+
+    Each thread counts a contiguous chunk into its own histogram; the
+    histograms are summed at the end so no atomics are needed.
+
+    Args:
+        pickup: int16 pickup zone IDs, each in [0, ZONE_ID_LIMIT)
+        dropoff: int16 dropoff zone IDs, each in [0, ZONE_ID_LIMIT)
+        n_threads: Number of per-thread histograms to split the rows across
+
+    Returns:
+        Flat int64 array of ZONE_ID_LIMIT * ZONE_ID_LIMIT counts indexed by
+        (pickup << ZONE_ID_BITS) | dropoff
+    """
+    n_keys = ZONE_ID_LIMIT * ZONE_ID_LIMIT
+    n_rows = pickup.shape[0]
+    chunk = (n_rows + n_threads - 1) // n_threads
+    local = np.zeros((n_threads, n_keys), np.int64)
+    for t in prange(n_threads):
+        end = min(n_rows, (t + 1) * chunk)
+        for i in range(t * chunk, end):
+            local[t, (pickup[i] << ZONE_ID_BITS) | dropoff[i]] += 1
+    return local.sum(axis=0)
+
+
+def warm_up_kernels() -> None:
+    """
+    Compile the Numba kernels ahead of the first upload.
+
+    Calls _count_pairs once on tiny int16 inputs so the JIT (or the load
+    from the on-disk cache) happens at startup instead of on a request.
+    """
+    empty = np.zeros(1, dtype=np.int16)
+    with _KERNEL_LOCK:
+        _count_pairs(empty, empty, numba.get_num_threads())
+    logger.info("Numba kernels compiled")
+
 
 def compute_top_routes(
-    df: pd.DataFrame,
+    df: pd.DataFrame | pa.Table,
     limit_rows: int = 50000,
     top_n_routes: int = 50,
 ) -> List[Tuple[int, int, int]]:
     """
     Compute top N most frequent routes from parquet dataframe.
 
+    Accepts either a pandas DataFrame or a pyarrow Table, so parquet data can
+    be counted without ever converting it to pandas.
+
     Args:
-        df: Pandas DataFrame with PULocationID and DOLocationID columns
+        df: Pandas DataFrame or Arrow Table with PULocationID and DOLocationID columns
         limit_rows: Maximum number of rows to process
         top_n_routes: Number of top routes to return
 
@@ -39,39 +112,304 @@ def compute_top_routes(
     Raises:
         ValueError: If required columns are missing
     """
+    is_table = isinstance(df, pa.Table)
+    columns = df.column_names if is_table else df.columns
+
     # Validate required columns exist
-    if "PULocationID" not in df.columns or "DOLocationID" not in df.columns:
+    if "PULocationID" not in columns or "DOLocationID" not in columns:
         logger.error("Missing required columns in dataframe")
         raise ValueError("DataFrame must contain 'PULocationID' and 'DOLocationID' columns")
 
     # Apply row limit to prevent memory issues
     if len(df) > limit_rows:
-        logger.info(f"Limiting dataframe from {len(df)} to {limit_rows} rows")
-        df = df.head(limit_rows)
+        logger.info("Limiting dataframe from %s to %s rows", len(df), limit_rows)
+        df = df.slice(0, limit_rows) if is_table else df.head(limit_rows)
+
+    # Trips with a null pickup or dropoff have no route. Drop them before
+    # counting: as NaN they would pass the range checks below and be cast
+    # to zone 0
+    df = _drop_null_pairs(df, is_table)
 
     # Compute route frequency
-    # Group by (pickup, dropoff) pairs and count occurrences
+    # Zone IDs outside the dense histogram range are counted on int64 keys,
+    # or with a hash groupby when even those can't hold them
+    pickup = df["PULocationID"].to_numpy()
+    dropoff = df["DOLocationID"].to_numpy()
+
+    if len(pickup) and (
+        pickup.min() < 0
+        or dropoff.min() < 0
+        or pickup.max() >= ZONE_ID_LIMIT
+        or dropoff.max() >= ZONE_ID_LIMIT
+    ):
+        if is_table:
+            result = _count_routes_arrow(df, top_n_routes)
+        elif (
+            pickup.min() >= 0
+            and dropoff.min() >= 0
+            and pickup.max() < WIDE_ID_LIMIT
+            and dropoff.max() < WIDE_ID_LIMIT
+        ):
+            result = _count_routes_unique(pickup, dropoff, top_n_routes)
+        else:
+            result = _count_routes_groupby(df, top_n_routes)
+    else:
+        # IDs fit in int16, which quarters the bytes streamed through the kernel
+        result = _count_routes_dense(
+            pickup.astype(np.int16, copy=False),
+            dropoff.astype(np.int16, copy=False),
+            top_n_routes,
+        )
+
+    logger.info(
+        "Computed %s top routes from %s rows, max frequency: %s",
+        len(result), len(df), result[0][2] if result else 0,
+    )
+
+    return result
+
+
+def _drop_null_pairs(
+    df: pd.DataFrame | pa.Table,
+    is_table: bool,
+) -> pd.DataFrame | pa.Table:
+    """
+    Drop rows whose PULocationID or DOLocationID is null.
+
+    Args:
+        df: Pandas DataFrame or Arrow Table with PULocationID and DOLocationID columns
+        is_table: Whether df is an Arrow Table
+
+    Returns:
+        The same kind of frame without null pairs; df itself if it has none
+    """
+    if is_table:
+        pickup, dropoff = df["PULocationID"], df["DOLocationID"]
+        if not pickup.null_count and not dropoff.null_count:
+            return df
+        return df.filter(pc.and_(pc.is_valid(pickup), pc.is_valid(dropoff)))
+
+    pairs = df[["PULocationID", "DOLocationID"]]
+    if not pairs.isna().to_numpy().any():
+        return df
+    return df.dropna(subset=["PULocationID", "DOLocationID"])
+
+
+def _count_routes_dense(
+    pickup: np.ndarray,
+    dropoff: np.ndarray,
+    top_n_routes: int,
+) -> List[Tuple[int, int, int]]:
+    """
+    Count route pairs with a dense histogram over packed zone-pair keys.
+
+    Small inputs are counted with np.bincount over the packed keys; larger
+    ones with the parallel _count_pairs Numba kernel.
+
+    Args:
+        pickup: int16 pickup zone IDs, each in [0, ZONE_ID_LIMIT)
+        dropoff: int16 dropoff zone IDs, each in [0, ZONE_ID_LIMIT)
+        top_n_routes: Number of top routes to return
+
+    Returns:
+        List of (pickup_zone_id, dropoff_zone_id, frequency) tuples sorted by
+        frequency descending, ties ordered by (pickup, dropoff)
+    """
+    if len(pickup) <= BINCOUNT_MAX_ROWS:
+        keys = (pickup.astype(np.int32) << ZONE_ID_BITS) | dropoff
+        counts = np.bincount(keys, minlength=ZONE_ID_LIMIT * ZONE_ID_LIMIT)
+    else:
+        # The kernel already uses every core, so waiting costs little
+        with _KERNEL_LOCK:
+            counts = _count_pairs(pickup, dropoff, numba.get_num_threads())
+
+    candidates = np.flatnonzero(counts)
+    if len(candidates) > top_n_routes:
+        # Keep every pair tied with the N-th largest count so ties stay deterministic
+        threshold = np.partition(counts[candidates], -top_n_routes)[-top_n_routes]
+        candidates = candidates[counts[candidates] >= threshold]
+    order = np.argsort(-counts[candidates], kind="stable")[:top_n_routes]
+    top_keys = candidates[order]
+
+    return [
+        (int(key >> ZONE_ID_BITS), int(key & (ZONE_ID_LIMIT - 1)), int(counts[key]))
+        for key in top_keys
+    ]
+
+
+def _count_routes_unique(
+    pickup: np.ndarray,
+    dropoff: np.ndarray,
+    top_n_routes: int,
+) -> List[Tuple[int, int, int]]:
+    """
+    Count route pairs with np.unique over int64 packed zone-pair keys.
+
+    Used for IDs too wide for the dense histogram, where a sort-based count
+    of one int64 column is cheaper than a two-column pandas groupby.
+
+    Args:
+        pickup: Pickup zone IDs, each in [0, WIDE_ID_LIMIT)
+        dropoff: Dropoff zone IDs, each in [0, WIDE_ID_LIMIT)
+        top_n_routes: Number of top routes to return
+
+    Returns:
+        List of (pickup_zone_id, dropoff_zone_id, frequency) tuples sorted by
+        frequency descending, ties ordered by (pickup, dropoff)
+    """
+    keys = (pickup.astype(np.int64) << PAIR_SHIFT) | dropoff.astype(np.int64)
+    # Keys come back sorted, which is (pickup, dropoff) order
+    keys, counts = np.unique(keys, return_counts=True)
+
+    if len(counts) > top_n_routes:
+        # Partial selection: keep only pairs tied with or above the N-th count
+        threshold = np.partition(counts, -top_n_routes)[-top_n_routes]
+        keep = counts >= threshold
+        keys, counts = keys[keep], counts[keep]
+    order = np.argsort(-counts, kind="stable")[:top_n_routes]
+
+    return [
+        (int(key >> PAIR_SHIFT), int(key & ((1 << PAIR_SHIFT) - 1)), int(count))
+        for key, count in zip(keys[order], counts[order])
+    ]
+
+
+def _count_routes_groupby(
+    df: pd.DataFrame,
+    top_n_routes: int,
+) -> List[Tuple[int, int, int]]:
+    """
+    Count route pairs with a pandas groupby.
+
+    Fallback for zone IDs that fit neither the dense histogram nor the
+    int64 packed keys, e.g. negative IDs.
+
+    Args:
+        df: Pandas DataFrame with PULocationID and DOLocationID columns
+        top_n_routes: Number of top routes to return
+
+    Returns:
+        List of (pickup_zone_id, dropoff_zone_id, frequency) tuples
+        sorted by frequency descending
+    """
+    # observed=True keeps categorical ID columns from expanding into the
+    # full cartesian product of categories
     route_counts = (
-        df.groupby(["PULocationID", "DOLocationID"])
+        df.groupby(["PULocationID", "DOLocationID"], observed=True)
         .size()
         .reset_index(name="frequency")
     )
+    frequency = route_counts["frequency"].to_numpy()
+    if len(route_counts) > top_n_routes:
+        # Partial selection: keep only pairs tied with or above the N-th count
+        threshold = np.partition(frequency, -top_n_routes)[-top_n_routes]
+        route_counts = route_counts[frequency >= threshold]
+    top_routes = route_counts.sort_values(
+        "frequency", ascending=False, kind="stable"
+    ).head(top_n_routes)
 
-    # Sort by frequency descending and take top N
-    top_routes = route_counts.nlargest(top_n_routes, "frequency")
+    return list(zip(
+        map(int, top_routes["PULocationID"].to_numpy()),
+        map(int, top_routes["DOLocationID"].to_numpy()),
+        map(int, top_routes["frequency"].to_numpy()),
+    ))
 
-    # Convert to list of tuples
-    result = [
-        (row["PULocationID"], row["DOLocationID"], row["frequency"])
-        for _, row in top_routes.iterrows()
-    ]
 
-    logger.info(
-        f"Computed {len(result)} top routes from {len(df)} rows, "
-        f"max frequency: {result[0][2] if result else 0}"
+def _count_routes_arrow(
+    table: pa.Table,
+    top_n_routes: int,
+) -> List[Tuple[int, int, int]]:
+    """
+    Count route pairs with Arrow's multithreaded hash aggregation.
+
+    Fallback for zone IDs that do not fit the packed-key histogram when the
+    data is already an Arrow Table.
+
+    Args:
+        table: Arrow Table with PULocationID and DOLocationID columns
+        top_n_routes: Number of top routes to return
+
+    Returns:
+        List of (pickup_zone_id, dropoff_zone_id, frequency) tuples sorted by
+        frequency descending, ties ordered by (pickup, dropoff)
+    """
+    route_counts = table.group_by(["PULocationID", "DOLocationID"]).aggregate(
+        [("PULocationID", "count")]
     )
+    pickup = route_counts["PULocationID"].to_numpy()
+    dropoff = route_counts["DOLocationID"].to_numpy()
+    frequency = route_counts["PULocationID_count"].to_numpy()
 
-    return result
+    if len(frequency) > top_n_routes:
+        # Partial selection: keep only pairs tied with or above the N-th count
+        threshold = np.partition(frequency, -top_n_routes)[-top_n_routes]
+        keep = frequency >= threshold
+        pickup, dropoff, frequency = pickup[keep], dropoff[keep], frequency[keep]
+    order = np.lexsort((dropoff, pickup, -frequency))[:top_n_routes]
+
+    return list(zip(
+        map(int, pickup[order]),
+        map(int, dropoff[order]),
+        map(int, frequency[order]),
+    ))
+
+
+def _pair_array(pairs: Iterable[Tuple[int, int]]) -> np.ndarray:
+    """
+    Collect (pickup, dropoff) pairs into an int64 array of shape (n, 2).
+
+    Args:
+        pairs: Iterable of (pickup_zone_id, dropoff_zone_id)
+
+    Returns:
+        int64 array with pickup IDs in column 0 and dropoff IDs in column 1
+    """
+    return np.array(list(pairs), dtype=np.int64).reshape(-1, 2)
+
+
+def _pack_pair_keys(pair_array: np.ndarray) -> np.ndarray:
+    """
+    Pack (pickup, dropoff) pairs into one int64 key per pair.
+
+    Args:
+        pair_array: int64 array of shape (n, 2) with IDs in [0, WIDE_ID_LIMIT)
+
+    Returns:
+        int64 array with pickup in the high and dropoff in the low 32 bits
+    """
+    return (pair_array[:, 0] << 32) | (pair_array[:, 1] & 0xFFFFFFFF)
+
+
+def _fits_wide(pairs: Iterable[Tuple[int, int]]) -> bool:
+    """
+    Check that every ID in pairs falls in [0, WIDE_ID_LIMIT).
+
+    Only such pairs can be packed into int64 keys without overflowing or
+    colliding with another pair.
+
+    Args:
+        pairs: Iterable of (pickup_zone_id, dropoff_zone_id)
+
+    Returns:
+        True if all pairs can be packed
+    """
+    return all(
+        0 <= pickup < WIDE_ID_LIMIT and 0 <= dropoff < WIDE_ID_LIMIT
+        for pickup, dropoff in pairs
+    )
+
+
+def _fits_dense(pair_array: np.ndarray) -> np.ndarray:
+    """
+    Flag the pairs whose IDs both fall in [0, ZONE_ID_LIMIT).
+
+    Args:
+        pair_array: int64 array of shape (n, 2)
+
+    Returns:
+        bool array of length n
+    """
+    return ((pair_array >= 0) & (pair_array < ZONE_ID_LIMIT)).all(axis=1)
 
 
 def optimize_route_selection(
@@ -95,20 +433,59 @@ def optimize_route_selection(
         This is part of the idempotency guarantee for Issue #9.
         Running the same upload twice won't create duplicate routes.
     """
-    new_routes = [
-        (pickup, dropoff, freq)
-        for pickup, dropoff, freq in routes
-        if (pickup, dropoff) not in existing_routes
-    ]
+    route_keys = [(pickup, dropoff) for pickup, dropoff, _ in routes]
+    if not (routes and existing_routes):
+        new_routes = list(routes)
+    elif not (_fits_wide(route_keys) and _fits_wide(existing_routes)):
+        # IDs outside [0, 2**31) would overflow or collide once packed
+        new_routes = [
+            route for route, key in zip(routes, route_keys)
+            if key not in existing_routes
+        ]
+    else:
+        route_pairs = _pair_array(route_keys)
+        existing_pairs = _pair_array(existing_routes)
+        if _fits_dense(route_pairs).all():
+            # Small IDs: mark existing pairs in a ZONE_ID_LIMIT^2 presence
+            # matrix and test every route with one gather. Existing pairs
+            # outside the matrix can't match any route, so they are dropped
+            existing_pairs = existing_pairs[_fits_dense(existing_pairs)]
+            presence = np.zeros((ZONE_ID_LIMIT, ZONE_ID_LIMIT), dtype=bool)
+            presence[existing_pairs[:, 0], existing_pairs[:, 1]] = True
+            is_new = ~presence[route_pairs[:, 0], route_pairs[:, 1]]
+        else:
+            is_new = ~np.isin(_pack_pair_keys(route_pairs), _pack_pair_keys(existing_pairs))
+        new_routes = [route for route, keep in zip(routes, is_new) if keep]
 
     logger.info(
-        f"Filtered routes: {len(routes)} input → {len(new_routes)} new routes "
-        f"({len(routes) - len(new_routes)} duplicates skipped)"
+        "Filtered routes: %s input → %s new routes "
+        "(%s duplicates skipped)",
+        len(routes), len(new_routes), len(routes) - len(new_routes),
     )
 
     return new_routes
 
 
+def iter_new_routes(
+    routes: Iterable[Tuple[int, int, int]],
+    existing_routes: Container[Tuple[int, int]],
+) -> Iterator[Tuple[int, int, int]]:
+    """
+    Lazily yield routes whose (pickup, dropoff) pair is not in existing_routes.
+
+    Streaming counterpart of optimize_route_selection for callers that
+    consume the routes in a single loop, so no intermediate list is built.
+
+    Args:
+        routes: Iterable of (pickup_zone_id, dropoff_zone_id, frequency) tuples
+        existing_routes: Set or dict keyed by (pickup_zone_id, dropoff_zone_id)
+
+    Returns:
+        Iterator over the routes that don't exist yet
+    """
+    return (route for route in routes if (route[0], route[1]) not in existing_routes)
+
+
 def validate_route_pair(pickup_zone_id: int, dropoff_zone_id: int) -> bool:
     """
     Validate a route pair meets business rules.
@@ -124,14 +501,55 @@ def validate_route_pair(pickup_zone_id: int, dropoff_zone_id: int) -> bool:
     - Both IDs must be positive
     - IDs must be different (can't route to same zone)
     """
-    if pickup_zone_id <= 0 or dropoff_zone_id <= 0:
+    # & on the three bools evaluates every rule, with no short-circuit branches
+    valid = (pickup_zone_id > 0) & (dropoff_zone_id > 0) & (pickup_zone_id != dropoff_zone_id)
+    if not valid:
         logger.warning(
-            f"Invalid zone IDs: pickup={pickup_zone_id}, dropoff={dropoff_zone_id}"
+            "Invalid route pair: pickup=%s, dropoff=%s",
+            pickup_zone_id, dropoff_zone_id,
         )
-        return False
+    return valid
+
+
+def validate_route_pairs(pickup: np.ndarray, dropoff: np.ndarray) -> np.ndarray:
+    """
+    Validate many route pairs at once with the rules of validate_route_pair.
+
+    Args:
+        pickup: Array of pickup zone IDs
+        dropoff: Array of dropoff zone IDs, same length as pickup
+
+    Returns:
+        bool array, True where the pair is valid
+    """
+    return (pickup > 0) & (dropoff > 0) & (pickup != dropoff)
+
+
+def split_valid_routes(
+    routes: List[Tuple[int, int, int]],
+) -> Tuple[List[Tuple[int, int, int]], List[Tuple[int, int, int]]]:
+    """
+    Split routes into valid and invalid ones in a single vectorized pass.
+
+    Applies the same rules as validate_route_pair to every route at once,
+    without a per-route function call or log line.
+
+    Args:
+        routes: List of (pickup_zone_id, dropoff_zone_id, frequency) tuples
+
+    Returns:
+        Tuple of (valid_routes, invalid_routes), each preserving input order
+    """
+    if not routes:
+        return [], []
+
+    pairs = np.array([(pickup, dropoff) for pickup, dropoff, _ in routes])
+    valid = validate_route_pairs(pairs[:, 0], pairs[:, 1])
+
+    valid_routes = [route for route, ok in zip(routes, valid) if ok]
+    invalid_routes = [route for route, ok in zip(routes, valid) if not ok]
 
-    if pickup_zone_id == dropoff_zone_id:
-        logger.warning(f"Same pickup/dropoff zone: {pickup_zone_id}")
-        return False
+    if invalid_routes:
+        logger.warning("Dropped %s invalid route pairs", len(invalid_routes))
 
-    return True
+    return valid_routes, invalid_routes
@@ -0,0 +1,64 @@
+"""
+Conditional GET support for the list endpoints.
+
+List responses carry a weak ETag derived from their JSON body. A client
+that sends it back in If-None-Match gets an empty 304 while the list is
+unchanged, instead of downloading and parsing the same body again.
+"""
+
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+def etag_for(body: bytes) -> str:
+    """
+    Build a weak ETag for a response body.
+
+    The tag is weak because GZipMiddleware may re-encode the body on the
+    way out; the JSON it carries stays the same.
+
+    Args:
+        body: Serialized response body
+
+    Returns:
+        str: ETag header value
+    """
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an ETag against an If-None-Match header value."""
+    if if_none_match.strip() == "*":
+        return True
+    tag = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == tag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def json_list_response(request: Request, body: bytes) -> Response:
+    """
+    Return a JSON list body, or 304 if the client already has it.
+
+    Args:
+        request: Incoming request, read for its If-None-Match header
+        body: Serialized JSON list
+
+    Returns:
+        Response: 200 with the body and its ETag, or 304 without a body
+    """
+    etag = etag_for(body)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag},
+        )
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag},
+    )
@@ -15,20 +15,31 @@ Dependencies:
 
 import logging
 from datetime import datetime
-from typing import List, Tuple
-import pandas as pd
+from typing import BinaryIO, Iterator, List, Tuple
+import pyarrow as pa
 import pyarrow.parquet as pq
 
 from app.storage import Storage
 from app.schemas import ZoneBase, RouteBase, UploadResponse
 from app.algorithm import (
     compute_top_routes,
-    optimize_route_selection,
-    validate_route_pair,
+    iter_new_routes,
+    split_valid_routes,
 )
 
 logger = logging.getLogger(__name__)
 
+# Only the pickup/dropoff columns are needed by the algorithm
+TRIP_COLUMNS = ["PULocationID", "DOLocationID"]
+TRIP_SCHEMA_INT16 = pa.schema([pa.field(column, pa.int16()) for column in TRIP_COLUMNS])
+PARQUET_BATCH_SIZE = 65536
+
+# Error message templates for the upload summary
+INVALID_ROUTE_ERROR = "Invalid route pair: pickup=%d, dropoff=%d"
+ROUTE_PROCESSING_ERROR = "Error processing route pickup=%d dropoff=%d: %s"
+ROUTE_UPDATE_ERROR = "Failed to update route %d: %s"
+ROUTE_CREATE_ERROR = "Failed to create route: %s"
+
 
 class IntegrationService:
     """
@@ -53,7 +64,7 @@ class IntegrationService:
 
     def process_parquet_upload(
         self,
-        file_path: str,
+        source: str | BinaryIO,
         file_name: str,
         mode: str,
         limit_rows: int = 50000,
@@ -64,11 +75,11 @@ class IntegrationService:
 
         This is the main integration point for Issue #9, connecting:
         1. Read parquet → compute_top_routes() from algorithm.py
-        2. Create missing zones → storage.create_zone()
-        3. Create/update routes → storage.create_route() / storage.update_route()
+        2. Create missing zones → storage.create_zones()
+        3. Create/update routes → storage.create_routes() / storage.update_route()
 
         Args:
-            file_path: Path to uploaded parquet file
+            source: Path or readable binary file object of the uploaded parquet
             file_name: Original filename
             mode: Processing mode ('create' or 'update')
             limit_rows: Maximum rows to process
@@ -84,8 +95,9 @@ class IntegrationService:
             raise ValueError(f"Invalid mode: {mode}. Must be 'create' or 'update'")
 
         logger.info(
-            f"Processing parquet upload: file={file_name}, mode={mode}, "
-            f"limit_rows={limit_rows}, top_n={top_n_routes}"
+            "Processing parquet upload: file=%s, mode=%s, "
+            "limit_rows=%s, top_n=%s",
+            file_name, mode, limit_rows, top_n_routes,
         )
 
         errors = []
@@ -95,69 +107,110 @@ class IntegrationService:
         routes_updated = 0
 
         try:
-            # Step 1: Read parquet file
-            df = pd.read_parquet(file_path)
-            rows_read = len(df)
-            logger.info(f"Read {rows_read} rows from parquet file")
+            # Step 1: Read parquet file (only the columns and rows we need)
+            trips = self._read_trip_rows(source, limit_rows)
+            rows_read = trips.num_rows
+            logger.info("Read %s rows from parquet file", rows_read)
 
             # Step 2: Compute top routes using algorithm
-            top_routes = compute_top_routes(df, limit_rows, top_n_routes)
+            top_routes = compute_top_routes(trips, limit_rows, top_n_routes)
             routes_detected = len(top_routes)
-            logger.info(f"Detected {routes_detected} top routes")
+            logger.info("Detected %s top routes", routes_detected)
+
+            # Steps 3-8 read and then write storage, so they run under the
+            # storage lock: two uploads of the same file must not both see
+            # a zone or route as missing and try to create it
+            with self.storage.lock:
+                # Step 3: Snapshot existing zones once for idempotency
+                existing_zones = {zone.id: zone for zone in self.storage.get_all_zones()}
+
+                # Step 4: Drop invalid route pairs in one pass
+                valid_routes, invalid_routes = split_valid_routes(top_routes)
+                errors.extend(
+                    INVALID_ROUTE_ERROR % (pickup_zone_id, dropoff_zone_id)
+                    for pickup_zone_id, dropoff_zone_id, _ in invalid_routes
+                )
+
+                # Look up only the detected pairs through the storage pair index,
+                # instead of copying every stored route
+                existing_routes = {}
+                for pickup_zone_id, dropoff_zone_id, _ in valid_routes:
+                    route = self.storage.find_route_by_zones(pickup_zone_id, dropoff_zone_id)
+                    if route is not None:
+                        existing_routes[(pickup_zone_id, dropoff_zone_id)] = route
+
+                # Step 5: Ensure all referenced zones exist (create with defaults if missing)
+                zone_ids = {
+                    zone_id
+                    for pickup_zone_id, dropoff_zone_id, _ in valid_routes
+                    for zone_id in (pickup_zone_id, dropoff_zone_id)
+                }
+                zone_result = self._ensure_zones_exist(zone_ids, mode, existing_zones)
+                zones_created = zone_result['created']
+                zones_updated = zone_result['updated']
+
+                # Step 6: Reserve IDs for every route that will be created at once
+                new_route_count = sum(
+                    1
+                    for pickup_zone_id, dropoff_zone_id, _ in valid_routes
+                    if (pickup_zone_id, dropoff_zone_id) not in existing_routes
+                )
+                route_ids = iter(self.storage.reserve_route_ids(new_route_count))
+                new_routes = []
+
+                # Step 7: Process each valid route. Create mode never touches
+                # existing routes, so they are filtered out while iterating
+                if mode == 'create':
+                    routes_to_process = iter_new_routes(valid_routes, existing_routes)
+                else:
+                    routes_to_process = valid_routes
+
+                for pickup_zone_id, dropoff_zone_id, frequency in routes_to_process:
+                    try:
+                        # Create or update route
+                        route_result = self._process_route(
+                            pickup_zone_id,
+                            dropoff_zone_id,
+                            frequency,
+                            mode,
+                            existing_routes,
+                            route_ids,
+                            new_routes,
+                        )
 
-            # Step 3: Get existing routes for idempotency
-            existing_routes = {
-                (route.pickup_zone_id, route.dropoff_zone_id)
-                for route in self.storage.get_all_routes()
-            }
+                        if route_result['created']:
+                            routes_created += 1
+                        elif route_result['updated']:
+                            routes_updated += 1
 
-            # Step 4: Process each route
-            for pickup_zone_id, dropoff_zone_id, frequency in top_routes:
-                try:
-                    # Validate route pair
-                    if not validate_route_pair(pickup_zone_id, dropoff_zone_id):
-                        errors.append(
-                            f"Invalid route pair: pickup={pickup_zone_id}, "
-                            f"dropoff={dropoff_zone_id}"
+                        if route_result.get('error'):
+                            errors.append(route_result['error'])
+
+                    except Exception as e:
+                        error_msg = ROUTE_PROCESSING_ERROR % (
+                            pickup_zone_id, dropoff_zone_id, e
                         )
-                        continue
-
-                    # Ensure zones exist (create with defaults if missing)
-                    zone_create_result = self._ensure_zones_exist(
-                        pickup_zone_id, dropoff_zone_id, mode
-                    )
-                    zones_created += zone_create_result['created']
-                    zones_updated += zone_create_result['updated']
-
-                    # Create or update route
-                    route_result = self._process_route(
-                        pickup_zone_id,
-                        dropoff_zone_id,
-                        frequency,
-                        mode,
-                        existing_routes,
-                    )
-
-                    if route_result['created']:
-                        routes_created += 1
-                    elif route_result['updated']:
-                        routes_updated += 1
-
-                    if route_result.get('error'):
-                        errors.append(route_result['error'])
-
-                except Exception as e:
-                    error_msg = (
-                        f"Error processing route pickup={pickup_zone_id} "
-                        f"dropoff={dropoff_zone_id}: {str(e)}"
-                    )
-                    logger.error(error_msg)
-                    errors.append(error_msg)
+                        logger.error(error_msg)
+                        errors.append(error_msg)
+
+                # Step 8: Insert all new routes with a single storage call
+                if new_routes:
+                    try:
+                        self.storage.create_routes(new_routes)
+                        logger.info("Created %s routes", len(new_routes))
+                    except ValueError as e:
+                        errors.append(ROUTE_CREATE_ERROR % e)
+                        routes_created = 0
 
             logger.info(
-                f"Upload complete: zones_created={zones_created}, "
-                f"zones_updated={zones_updated}, routes_created={routes_created}, "
-                f"routes_updated={routes_updated}, errors={len(errors)}"
+                "Upload complete: zones_created=%s, "
+                "zones_updated=%s, routes_created=%s, "
+                "routes_updated=%s, errors=%s",
+                zones_created,
+                zones_updated,
+                routes_created,
+                routes_updated,
+                len(errors),
             )
 
             return UploadResponse(
@@ -173,55 +226,131 @@ class IntegrationService:
 
         except ValueError as e:
             # Missing columns or invalid data
-            logger.error(f"Parquet validation error: {str(e)}")
+            logger.error("Parquet validation error: %s", e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error processing parquet: {str(e)}")
+            logger.error("Unexpected error processing parquet: %s", e)
             raise
 
+    def _read_trip_rows(
+        self,
+        source: str | BinaryIO,
+        limit_rows: int,
+    ) -> pa.Table:
+        """
+        Read at most limit_rows pickup/dropoff pairs from a parquet file.
+
+        Batches are streamed from the file and reading stops as soon as
+        limit_rows rows have been collected, so the rest of the file is
+        never decoded.
+
+        Args:
+            source: Path or readable binary file object of the parquet file
+            limit_rows: Maximum number of rows to read
+
+        Returns:
+            Arrow Table with PULocationID and DOLocationID columns
+
+        Raises:
+            ValueError: If required columns are missing
+        """
+        parquet_file = pq.ParquetFile(source)
+        schema = parquet_file.schema_arrow
+        if not all(column in schema.names for column in TRIP_COLUMNS):
+            raise ValueError(
+                "Parquet file must contain 'PULocationID' and 'DOLocationID' columns"
+            )
+
+        # Only the leading row groups that hold the first limit_rows rows are
+        # opened, and batches are never larger than the rows still needed
+        row_groups = []
+        rows_in_groups = 0
+        for index in range(parquet_file.num_row_groups):
+            if rows_in_groups >= limit_rows:
+                break
+            row_groups.append(index)
+            rows_in_groups += parquet_file.metadata.row_group(index).num_rows
+
+        table_schema = pa.schema([schema.field(column) for column in TRIP_COLUMNS])
+
+        # TLC LocationIDs fit in int16, so each batch is narrowed as it
+        # arrives and the wide batches can be freed straight away; if any
+        # value doesn't fit, the file's types are kept for the whole table
+        compact = True
+        batches = []
+        remaining = limit_rows
+        for batch in parquet_file.iter_batches(
+            batch_size=min(limit_rows, PARQUET_BATCH_SIZE),
+            row_groups=row_groups,
+            columns=TRIP_COLUMNS,
+        ):
+            if batch.num_rows > remaining:
+                batch = batch.slice(0, remaining)
+            if compact:
+                try:
+                    batch = _cast_batch(batch, TRIP_SCHEMA_INT16)
+                except pa.ArrowInvalid:
+                    logger.info("Zone IDs do not fit in int16, keeping parquet column types")
+                    compact = False
+                    batches = [_cast_batch(b, table_schema) for b in batches]
+            batches.append(batch)
+            remaining -= batch.num_rows
+            if remaining == 0:
+                break
+
+        table = pa.Table.from_batches(
+            batches, schema=TRIP_SCHEMA_INT16 if compact else table_schema
+        )
+
+        return table
+
     def _ensure_zones_exist(
         self,
-        pickup_zone_id: int,
-        dropoff_zone_id: int,
+        zone_ids: set[int],
         mode: str,
+        existing_zones: dict,
     ) -> dict:
         """
-        Ensure both zones exist, creating them with defaults if necessary.
+        Ensure all zones exist, creating missing ones with defaults in one batch.
 
         Args:
-            pickup_zone_id: Pickup zone ID
-            dropoff_zone_id: Dropoff zone ID
+            zone_ids: Zone IDs referenced by the routes being processed
             mode: Processing mode ('create' or 'update')
+            existing_zones: Map of zone_id -> zone, updated with created zones
 
         Returns:
             dict with 'created' and 'updated' counts
         """
-        created = 0
-        updated = 0
+        # Zone IDs come from split_valid_routes, which already enforces the
+        # positive-ID rule, so the schema validators can be skipped
+        new_zones = [
+            ZoneBase.model_construct(
+                id=zone_id,
+                borough="Unknown",
+                zone_name=f"Zone {zone_id}",
+                service_zone="Unknown",
+                active=True,
+            )
+            for zone_id in sorted(zone_ids - existing_zones.keys())
+        ]
+        self.storage.create_zones(new_zones)
+        existing_zones.update((zone.id, zone) for zone in new_zones)
+        if new_zones:
+            logger.info("Created %s default zones", len(new_zones))
 
-        for zone_id in [pickup_zone_id, dropoff_zone_id]:
-            if not self.storage.zone_exists(zone_id):
-                # Create zone with default values
-                zone = ZoneBase(
-                    id=zone_id,
-                    borough="Unknown",
-                    zone_name=f"Zone {zone_id}",
-                    service_zone="Unknown",
-                    active=True,
-                )
-                self.storage.create_zone(zone)
-                created += 1
-                logger.info(f"Created default zone: id={zone_id}")
-            elif mode == 'update':
-                # Mark existing zone as active
-                existing_zone = self.storage.get_zone(zone_id)
-                if existing_zone and not existing_zone.active:
-                    existing_zone.active = True
+        updated = 0
+        if mode == 'update':
+            # Mark existing zones as active
+            for zone_id in zone_ids:
+                existing_zone = existing_zones[zone_id]
+                if not existing_zone.active:
+                    existing_zone = existing_zone.model_copy(update={'active': True})
                     self.storage.update_zone(existing_zone)
+                    existing_zones[zone_id] = existing_zone
                     updated += 1
-                    logger.info(f"Activated zone: id={zone_id}")
+                    logger.info("Activated zone: id=%s", zone_id)
 
-        return {'created': created, 'updated': updated}
+        return {'created': len(new_zones), 'updated': updated}
 
     def _process_route(
         self,
@@ -229,7 +358,9 @@ class IntegrationService:
         dropoff_zone_id: int,
         frequency: int,
         mode: str,
-        existing_routes: set,
+        existing_routes: dict,
+        route_ids: Iterator[int],
+        new_routes: List[RouteBase],
     ) -> dict:
         """
         Create or update a route based on mode and existence.
@@ -243,37 +374,45 @@ class IntegrationService:
             dropoff_zone_id: Dropoff zone ID
             frequency: Trip frequency from parquet data
             mode: Processing mode
-            existing_routes: Set of existing (pickup, dropoff) tuples
+            existing_routes: Map of (pickup, dropoff) -> route, updated with
+                created routes
+            route_ids: Iterator over route IDs reserved for new routes
+            new_routes: List collecting routes to be created in one batch
 
         Returns:
-            dict with 'created', 'updated', and optional 'error' keys
+            dict with 'created' (queued for creation), 'updated', and
+            optional 'error' keys
         """
         result = {'created': False, 'updated': False, 'error': None}
 
         route_pair = (pickup_zone_id, dropoff_zone_id)
-        existing_route = self.storage.find_route_by_zones(pickup_zone_id, dropoff_zone_id)
+        existing_route = existing_routes.get(route_pair)
 
         if existing_route:
             # Route exists
             if mode == 'update':
                 # Update the route (mark as active)
-                existing_route.active = True
-                existing_route.name = f"Route {pickup_zone_id}→{dropoff_zone_id} (freq:{frequency})"
+                updated_route = existing_route.model_copy(update={
+                    'active': True,
+                    'name': f"Route {pickup_zone_id}→{dropoff_zone_id} (freq:{frequency})",
+                })
                 try:
-                    self.storage.update_route(existing_route.id, existing_route)
+                    self.storage.update_route(existing_route.id, updated_route)
+                    existing_routes[route_pair] = updated_route
                     result['updated'] = True
-                    logger.info(f"Updated route: id={existing_route.id}")
+                    logger.info("Updated route: id=%s", existing_route.id)
                 except ValueError as e:
-                    result['error'] = f"Failed to update route {existing_route.id}: {str(e)}"
+                    result['error'] = ROUTE_UPDATE_ERROR % (existing_route.id, e)
             else:
                 # Create mode: skip existing route (idempotency)
-                logger.debug(f"Skipping existing route: {route_pair}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Skipping existing route: %s", route_pair)
         else:
-            # Route doesn't exist: create it
-            # Generate new route ID using storage method
-            new_route_id = self.storage.assing_route_id()
+            # Route doesn't exist: queue it with the next reserved ID
+            new_route_id = next(route_ids)
 
-            new_route = RouteBase(
+            # The pair passed split_valid_routes, so skip re-validation
+            new_route = RouteBase.model_construct(
                 id=new_route_id,
                 pickup_zone_id=pickup_zone_id,
                 dropoff_zone_id=dropoff_zone_id,
@@ -281,14 +420,33 @@ class IntegrationService:
                 active=True,
             )
 
-            try:
-                self.storage.create_route(new_route)
-                result['created'] = True
-                logger.info(
-                    f"Created route: id={new_route_id}, "
-                    f"{pickup_zone_id}→{dropoff_zone_id}"
+            new_routes.append(new_route)
+            existing_routes[route_pair] = new_route
+            result['created'] = True
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Queued route: id=%s, %s→%s",
+                    new_route_id, pickup_zone_id, dropoff_zone_id,
                 )
-            except ValueError as e:
-                result['error'] = f"Failed to create route: {str(e)}"
 
         return result
+
+
+def _cast_batch(batch: pa.RecordBatch, schema: pa.Schema) -> pa.RecordBatch:
+    """
+    Cast every column of a record batch to the types in schema.
+
+    Args:
+        batch: Record batch with the same column names as schema
+        schema: Target schema
+
+    Returns:
+        Record batch with columns cast to the schema's types
+
+    Raises:
+        pyarrow.ArrowInvalid: If a value does not fit the target type
+    """
+    return pa.RecordBatch.from_arrays(
+        [batch.column(i).cast(field.type) for i, field in enumerate(schema)],
+        schema=schema,
+    )
@@ -5,16 +5,40 @@ This module creates the FastAPI application instance and wires up
 all route modules for zones, routes, and uploads.
 """
 
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
 
 # Router imports
 from app import routes_zones, routes_routes, routes_uploads
+from app.algorithm import warm_up_kernels
+from app.schemas import HealthResponse
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Application lifespan: compile the route counting kernels before serving.
+
+    Args:
+        app: The FastAPI application
+    """
+    warm_up_kernels()
+    yield
+
 
 app = FastAPI(
     title="Demand Prediction Service",
     description="NYC TLC Zones and Routes Management System",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware to allow Streamlit frontend to communicate with API
@@ -26,8 +50,53 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger bodies (zone/route lists) for clients sending
+# Accept-Encoding: gzip; small single-resource responses go out as-is
+app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
+
+
+@app.exception_handler(ValueError)
+async def value_error_handler(request: Request, exc: ValueError) -> JSONResponse:
+    """
+    Turn a ValueError escaping an endpoint into a 400 response.
+
+    Storage raises ValueError for duplicate IDs and invalid references, so
+    endpoints can let it propagate instead of wrapping every call.
+
+    Args:
+        request: The request being handled
+        exc: The raised error
+
+    Returns:
+        JSONResponse: 400 with the error message as detail
+    """
+    logger.warning("%s %s failed validation: %s", request.method, request.url.path, exc)
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)}
+    )
+
+
+@app.exception_handler(Exception)
+async def unexpected_error_handler(request: Request, exc: Exception) -> JSONResponse:
+    """
+    Return a generic 500 body for any unhandled error.
+
+    The server still logs the traceback, so it is not logged again here.
+
+    Args:
+        request: The request being handled
+        exc: The raised error
+
+    Returns:
+        JSONResponse: 500 with a generic detail message
+    """
+    return JSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={"detail": "internal server error"},
+    )
+
 
-@app.get("/health", tags=["Health"])
+@app.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
     """
     Health check endpoint to verify API is running.
@@ -46,4 +115,6 @@ app.include_router(routes_uploads.router, tags=["Uploads"])
 
 if __name__ == "__main__":
     import uvicorn
+    # loop/http stay on "auto": uvloop and httptools are used when installed
+    # (uvicorn[standard]), and Windows, where uvloop isn't available, still runs
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -3,6 +3,7 @@ Routes CRUD endpoints.
 
 This module will implement all CRUD operations for Route resources:
 - POST /routes - Create a new route
+- POST /routes/batch - Create several routes at once
 - GET /routes - List all routes (with optional filters)
 - GET /routes/{id} - Get a specific route
 - PUT /routes/{id} - Update a route
@@ -14,9 +15,11 @@ TODO: Implement in issue #11
 from app.storage import get_global_storage
 import logging
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
+from pydantic import TypeAdapter
 
-from app.schemas import RouteBase, RouteCreate
+from app.http_cache import json_list_response
+from app.schemas import RouteBase, RouteBatch, RouteCreate
 
 router = APIRouter()
 
@@ -24,6 +27,10 @@ logger = logging.getLogger(__name__)
 
 storage = get_global_storage()
 
+# Built once so list responses are serialized straight to JSON bytes by
+# pydantic-core, without FastAPI re-validating every stored route
+ROUTE_LIST_ADAPTER = TypeAdapter(list[RouteBase])
+
 
 @router.post(
     "/routes",
@@ -36,45 +43,80 @@ async def create_route(route: RouteCreate):
     Create a new route.
     """
     logger.debug(
-        f"create_route called with pickup={route.pickup_zone_id} dropoff={route.dropoff_zone_id}"
+        "create_route called with pickup=%s dropoff=%s",
+        route.pickup_zone_id, route.dropoff_zone_id,
+    )
+
+    # Create RouteBase object with assigned ID
+    route_id = storage.assign_route_id()
+    route_base = RouteBase(
+        id=route_id,
+        pickup_zone_id=route.pickup_zone_id,
+        dropoff_zone_id=route.dropoff_zone_id,
+        name=route.name,
+        active=route.active
+    )
+    logger.debug("Assigned route id=%s", route_id)
+
+    # A ValueError from storage becomes a 400 in the app-wide handler
+    storage.create_route(route_base)
+    logger.info(
+        "Route created: id=%s pickup=%s dropoff=%s name=%s",
+        route_id, route.pickup_zone_id, route.dropoff_zone_id, route.name,
     )
 
-    try:
-        # Create RouteBase object with assigned ID
-        route_id = storage.assign_route_id()
-        route_base = RouteBase(
+    return route_base
+
+
+@router.post(
+    "/routes/batch",
+    response_model=list[RouteBase],
+    status_code=status.HTTP_201_CREATED,
+    tags=["Routes"],
+)
+async def create_routes(batch: RouteBatch):
+    """
+    Create several routes in a single request.
+
+    IDs are reserved as one consecutive block and the batch is
+    all-or-nothing: if any route references a missing zone, no route
+    is created.
+
+    Args:
+        batch: Routes to create
+
+    Returns:
+        Created routes, with their assigned IDs
+
+    Raises:
+        400: A pickup or dropoff zone doesn't exist
+        422: Invalid request body
+    """
+    logger.debug("create_routes called with %s routes", len(batch.routes))
+
+    # RouteCreate already validated every field, so skip re-validation
+    routes = [
+        RouteBase.model_construct(
             id=route_id,
             pickup_zone_id=route.pickup_zone_id,
             dropoff_zone_id=route.dropoff_zone_id,
             name=route.name,
-            active=route.active
+            active=route.active,
         )
-        logger.debug(f"Assigned route id={route_id}")
-
-        storage.create_route(route_base)
-        logger.info(
-            f"Route created: id={route_id} pickup={route.pickup_zone_id} dropoff={route.dropoff_zone_id} name={route.name}"
+        for route_id, route in zip(
+            storage.reserve_route_ids(len(batch.routes)), batch.routes
         )
+    ]
+    # A ValueError from storage becomes a 400 in the app-wide handler
+    storage.create_routes(routes)
+    logger.info("Routes created: count=%s", len(routes))
 
-        return route_base
-    except ValueError as ve:
-        logger.warning(f"create_route failed validation: {ve}")
-
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except Exception as exc:  # unexpected
-        logger.exception(f"create_route unexpected error: {exc}")
-
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="internal server error",
-        )
+    return routes
 
 
 @router.get("/routes", response_model=list[RouteBase], tags=["Routes"])
 async def list_routes(
+    request: Request,
     active: bool | None = None,
     pickup_zone_id: int | None = None,
     dropoff_zone_id: int | None = None,
@@ -83,13 +125,14 @@ async def list_routes(
     List routes with optional filters.
     """
     logger.debug(
-        f"list_routes called with filters active={active} pickup={pickup_zone_id} dropoff={dropoff_zone_id}"
+        "list_routes called with filters active=%s pickup=%s dropoff=%s",
+        active, pickup_zone_id, dropoff_zone_id,
     )
 
     result = storage.get_all_routes(active, pickup_zone_id, dropoff_zone_id)
-    logger.info(f"list_routes returning {len(result)} routes")
+    logger.info("list_routes returning %s routes", len(result))
 
-    return result
+    return json_list_response(request, ROUTE_LIST_ADAPTER.dump_json(result))
 
 
 @router.get("/routes/{route_id}", response_model=RouteBase, tags=["Routes"])
@@ -97,29 +140,18 @@ async def get_route(route_id: int):
     """
     Get a specific route by ID.
     """
-    logger.debug(f"get_route called for id={route_id}")
-
-    try:
-        result = storage.get_route(route_id)
-        if result:
-            logger.info(f"Route retrieved: id={result.id} name={result.name}")
-
-            return result
-        else:
-            logger.info(f"Route not found: id={route_id}")
-
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="route not found"
-            )
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except Exception as exc:
-        logger.exception(f"get_route unexpected error: {exc}")
+    logger.debug("get_route called for id=%s", route_id)
+
+    result = storage.get_route(route_id)
+    if result:
+        logger.info("Route retrieved: id=%s name=%s", result.id, result.name)
+
+        return result
+    else:
+        logger.info("Route not found: id=%s", route_id)
 
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="internal server error",
+            status_code=status.HTTP_404_NOT_FOUND, detail="route not found"
         )
 
 
@@ -128,27 +160,13 @@ async def update_route(route_id: int, route: RouteBase):
     """
     Update an existing route.
     """
-    logger.debug(f"update_route called for id={route_id} payload_id={route.id}")
-
-    try:
-        storage.update_route(route_id, route)
-        logger.info(f"Route updated: id={route_id} name={route.name}")
+    logger.debug("update_route called for id=%s payload_id=%s", route_id, route.id)
 
-        return route
-    except ValueError as ve:
-        logger.warning(f"update_route failed validation: {ve}")
+    # A ValueError from storage becomes a 400 in the app-wide handler
+    storage.update_route(route_id, route)
+    logger.info("Route updated: id=%s name=%s", route_id, route.name)
 
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except Exception as exc:
-        logger.exception(f"update_route unexpected error: {exc}")
-
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="internal server error",
-        )
+    return route
 
 
 @router.delete(
@@ -158,26 +176,16 @@ async def delete_route(route_id: int):
     """
     Delete a route by ID.
     """
-    logger.debug(f"delete_route called for id={route_id}")
-
-    try:
-        deleted = storage.delete_route(route_id)
-        if deleted:
-            logger.info(f"Route deleted: id={route_id}")
-
-            return
-        else:
-            logger.warning(f"Attempted to delete non-existent route: id={route_id}")
-
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="route not found"
-            )
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except Exception as exc:
-        logger.exception(f"delete_route unexpected error: {exc}")
+    logger.debug("delete_route called for id=%s", route_id)
+
+    deleted = storage.delete_route(route_id)
+    if deleted:
+        logger.info("Route deleted: id=%s", route_id)
+
+        return
+    else:
+        logger.warning("Attempted to delete non-existent route: id=%s", route_id)
+
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="internal server error",
+            status_code=status.HTTP_404_NOT_FOUND, detail="route not found"
         )
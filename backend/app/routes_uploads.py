@@ -1,8 +1,10 @@
 """
 Upload endpoints for parquet files.
 
-This module implements the parquet file upload endpoint:
+This module implements the parquet file upload endpoints:
 - POST /uploads/trips-parquet - Upload and process NYC TLC trip data
+- POST /uploads/trips-parquet/jobs - Same, processed in the background
+- GET /uploads/jobs/{job_id} - Status and summary of a background upload
 
 The endpoint:
 1. Accepts parquet file uploads via multipart/form-data
@@ -14,11 +16,20 @@ Issue #9: Integrate Algorithm with API Routes
 """
 
 import logging
-import tempfile
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
-from io import BytesIO
+import uuid
+import pyarrow as pa
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    UploadFile,
+    File,
+    Form,
+    HTTPException,
+    status,
+)
+from starlette.concurrency import run_in_threadpool
 
-from app.schemas import UploadResponse
+from app.schemas import UploadJob, UploadResponse
 from app.storage import get_global_storage
 from app.integration import IntegrationService
 
@@ -29,6 +40,84 @@ logger = logging.getLogger(__name__)
 storage = get_global_storage()
 integration_service = IntegrationService(storage)
 
+# Background upload jobs by id; past MAX_UPLOAD_JOBS the oldest finished
+# jobs are dropped, never ones still pending or running
+MAX_UPLOAD_JOBS = 100
+upload_jobs: dict[str, UploadJob] = {}
+
+
+def _make_room_for_job() -> None:
+    """
+    Drop the oldest finished jobs until a new job fits under MAX_UPLOAD_JOBS.
+
+    Raises:
+        HTTPException: 503 if every tracked job is still pending or running
+    """
+    if len(upload_jobs) < MAX_UPLOAD_JOBS:
+        return
+
+    finished = [
+        job_id for job_id, job in upload_jobs.items()
+        if job.status in ("done", "failed")
+    ]
+    for job_id in finished[: len(upload_jobs) - MAX_UPLOAD_JOBS + 1]:
+        del upload_jobs[job_id]
+
+    if len(upload_jobs) >= MAX_UPLOAD_JOBS:
+        logger.warning("Upload job rejected: %s jobs still in progress", len(upload_jobs))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many upload jobs in progress, retry later",
+        )
+
+
+def _validate_upload_params(
+    file: UploadFile,
+    mode: str,
+    limit_rows: int,
+    top_n_routes: int,
+) -> None:
+    """
+    Validate the upload form fields shared by the upload endpoints.
+
+    Args:
+        file: Uploaded parquet file
+        mode: Processing mode ('create' or 'update')
+        limit_rows: Maximum number of rows to process
+        top_n_routes: Number of top routes to extract
+
+    Raises:
+        HTTPException: 400 if any field is invalid
+    """
+    # Validate file type
+    if not file.filename or not file.filename.endswith('.parquet'):
+        logger.warning("Invalid file type: %s", file.filename)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be a .parquet file"
+        )
+
+    # Validate mode
+    if mode not in ['create', 'update']:
+        logger.warning("Invalid mode: %s", mode)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid mode: {mode}. Must be 'create' or 'update'"
+        )
+
+    # Validate parameters
+    if limit_rows <= 0 or limit_rows > 1000000:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="limit_rows must be between 1 and 1,000,000"
+        )
+
+    if top_n_routes <= 0 or top_n_routes > 500:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="top_n_routes must be between 1 and 500"
+        )
+
 
 @router.post(
     "/uploads/trips-parquet",
@@ -45,7 +134,8 @@ async def upload_parquet(
     """
     Upload and process a parquet file with NYC TLC trip data.
 
-    This endpoint processes the file in memory without persisting to disk.
+    The uploaded file is read directly by pyarrow without copying it into
+    another buffer or temporary file.
     It extracts top N route pairs and creates/updates zones and routes.
 
     Args:
@@ -63,77 +153,169 @@ async def upload_parquet(
         500: Unexpected server error
     """
     logger.info(
-        f"upload_parquet called: filename={file.filename}, mode={mode}, "
-        f"limit_rows={limit_rows}, top_n={top_n_routes}"
+        "upload_parquet called: filename=%s, mode=%s, "
+        "limit_rows=%s, top_n=%s",
+        file.filename, mode, limit_rows, top_n_routes,
     )
 
-    # Validate file type
-    if not file.filename or not file.filename.endswith('.parquet'):
-        logger.warning(f"Invalid file type: {file.filename}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File must be a .parquet file"
-        )
+    _validate_upload_params(file, mode, limit_rows, top_n_routes)
 
-    # Validate mode
-    if mode not in ['create', 'update']:
-        logger.warning(f"Invalid mode: {mode}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid mode: {mode}. Must be 'create' or 'update'"
-        )
-
-    # Validate parameters
-    if limit_rows <= 0 or limit_rows > 1000000:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="limit_rows must be between 1 and 1,000,000"
+    try:
+        # Hand the spooled upload straight to pyarrow: no bytes copy and no
+        # extra temporary file. The parsing and counting are blocking, so run
+        # them in the threadpool to keep the event loop free for other requests
+        file.file.seek(0)
+        result = await run_in_threadpool(
+            integration_service.process_parquet_upload,
+            source=file.file,
+            file_name=file.filename,
+            mode=mode,
+            limit_rows=limit_rows,
+            top_n_routes=top_n_routes,
         )
 
-    if top_n_routes <= 0 or top_n_routes > 500:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="top_n_routes must be between 1 and 500"
+        logger.info(
+            "Upload processed successfully: zones_created=%s, "
+            "routes_created=%s, errors=%s",
+            result.zones_created, result.routes_created, len(result.errors),
         )
 
-    try:
-        # Read file contents into memory (no disk write!)
-        contents = await file.read()
-        logger.info(f"Read {len(contents)} bytes from uploaded file")
-
-        # Create a temporary file for pandas to read
-        # This is still in-memory processing via tempfile
-        with tempfile.NamedTemporaryFile(delete=True, suffix='.parquet') as tmp_file:
-            tmp_file.write(contents)
-            tmp_file.flush()
-
-            # Process parquet using integration service
-            result = integration_service.process_parquet_upload(
-                file_path=tmp_file.name,
-                file_name=file.filename,
-                mode=mode,
-                limit_rows=limit_rows,
-                top_n_routes=top_n_routes,
-            )
-
-            logger.info(
-                f"Upload processed successfully: zones_created={result.zones_created}, "
-                f"routes_created={result.routes_created}, errors={len(result.errors)}"
-            )
-
-            return result
+        return result
 
     except ValueError as e:
         # Business logic errors (missing columns, invalid data)
-        logger.error(f"Validation error processing parquet: {str(e)}")
+        logger.error("Validation error processing parquet: %s", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
     except Exception as e:
         # Unexpected errors
-        logger.exception(f"Unexpected error processing upload: {str(e)}")
+        logger.exception("Unexpected error processing upload: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error: {str(e)}"
         )
+
+
+async def _run_upload_job(
+    job: UploadJob,
+    source: pa.BufferReader,
+    file_name: str,
+    mode: str,
+    limit_rows: int,
+    top_n_routes: int,
+) -> None:
+    """
+    Process a queued upload in the threadpool and record its outcome.
+
+    Args:
+        job: Job to update with the outcome
+        source: Parquet file contents
+        file_name: Original filename
+        mode: Processing mode ('create' or 'update')
+        limit_rows: Maximum number of rows to process
+        top_n_routes: Number of top routes to extract
+    """
+    job.status = "running"
+    try:
+        job.result = await run_in_threadpool(
+            integration_service.process_parquet_upload,
+            source=source,
+            file_name=file_name,
+            mode=mode,
+            limit_rows=limit_rows,
+            top_n_routes=top_n_routes,
+        )
+        job.status = "done"
+        logger.info("Upload job %s done", job.job_id)
+    except Exception as e:
+        logger.exception("Upload job %s failed: %s", job.job_id, e)
+        job.error = str(e)
+        job.status = "failed"
+
+
+@router.post(
+    "/uploads/trips-parquet/jobs",
+    response_model=UploadJob,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["Uploads"],
+)
+async def submit_parquet_upload(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="Parquet file to upload"),
+    mode: str = Form(..., description="Processing mode: 'create' or 'update'"),
+    limit_rows: int = Form(50000, description="Maximum rows to process"),
+    top_n_routes: int = Form(50, description="Number of top routes to extract"),
+):
+    """
+    Queue a parquet file for processing and return immediately.
+
+    Takes the same fields as POST /uploads/trips-parquet. The file is read
+    into memory before responding, since the upload is closed once the
+    request ends, and processed after the response is sent.
+
+    Args:
+        background_tasks: FastAPI background task runner
+        file: Uploaded parquet file
+        mode: Processing mode ('create' or 'update')
+        limit_rows: Maximum number of rows to process (default: 50000)
+        top_n_routes: Number of top routes to extract (default: 50)
+
+    Returns:
+        UploadJob: The pending job, to be polled at GET /uploads/jobs/{job_id}
+
+    Raises:
+        400: Invalid file name, mode, or parameters
+        503: MAX_UPLOAD_JOBS jobs are still pending or running
+    """
+    logger.info(
+        "submit_parquet_upload called: filename=%s, mode=%s, "
+        "limit_rows=%s, top_n=%s",
+        file.filename, mode, limit_rows, top_n_routes,
+    )
+
+    _validate_upload_params(file, mode, limit_rows, top_n_routes)
+
+    source = pa.BufferReader(await file.read())
+
+    # No await between the check and the insert, so concurrent submissions
+    # can't both take the last slot
+    _make_room_for_job()
+    job = UploadJob(job_id=uuid.uuid4().hex, status="pending")
+    upload_jobs[job.job_id] = job
+
+    background_tasks.add_task(
+        _run_upload_job,
+        job,
+        source,
+        file.filename,
+        mode,
+        limit_rows,
+        top_n_routes,
+    )
+    logger.info("Upload job %s queued", job.job_id)
+
+    return job
+
+
+@router.get("/uploads/jobs/{job_id}", response_model=UploadJob, tags=["Uploads"])
+async def get_upload_job(job_id: str):
+    """
+    Get the status of a background parquet upload.
+
+    Args:
+        job_id: Id returned by POST /uploads/trips-parquet/jobs
+
+    Returns:
+        UploadJob: Job status, with the summary once done
+
+    Raises:
+        404: Job not found
+    """
+    job = upload_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="upload job not found"
+        )
+    return job
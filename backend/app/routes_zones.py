@@ -3,6 +3,7 @@ Zones CRUD endpoints.
 
 This module implements all CRUD operations for Zone resources:
 - POST /zones - Create a new zone
+- POST /zones/batch - Create several zones at once
 - GET /zones - List all zones (with optional filters)
 - GET /zones/{id} - Get a specific zone
 - PUT /zones/{id} - Update a zone
@@ -14,9 +15,10 @@ Issue #10: Implement Zones Endpoints
 from app.storage import get_global_storage
 import logging
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 
-from app.schemas import ZoneBase
+from app.http_cache import json_list_response
+from app.schemas import ZONE_LIST_ADAPTER, ZoneBase, ZoneBatch
 
 router = APIRouter()
 
@@ -46,34 +48,54 @@ async def create_zone(zone: ZoneBase):
         422: Invalid request body
     """
     logger.debug(
-        f"create_zone called with id={zone.id} borough={zone.borough} name={zone.zone_name}"
+        "create_zone called with id=%s borough=%s name=%s",
+        zone.id, zone.borough, zone.zone_name,
     )
 
-    try:
-        storage.create_zone(zone)
-        logger.info(
-            f"Zone created: id={zone.id} borough={zone.borough} zone_name={zone.zone_name}"
-        )
+    # A ValueError from storage becomes a 400 in the app-wide handler
+    storage.create_zone(zone)
+    logger.info(
+        "Zone created: id=%s borough=%s zone_name=%s",
+        zone.id, zone.borough, zone.zone_name,
+    )
 
-        return zone
-    except ValueError as ve:
-        logger.warning(f"create_zone failed validation: {ve}")
+    return zone
 
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
-    except HTTPException:
-        # Re-raise HTTP exceptions (like 404 from storage operations)
-        raise
-    except Exception as exc:  # unexpected
-        logger.exception(f"create_zone unexpected error: {exc}")
 
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="internal server error",
-        )
+@router.post(
+    "/zones/batch",
+    response_model=list[ZoneBase],
+    status_code=status.HTTP_201_CREATED,
+    tags=["Zones"],
+)
+async def create_zones(batch: ZoneBatch):
+    """
+    Create several zones in a single request.
+
+    The batch is all-or-nothing: if any zone ID already exists or is
+    repeated in the batch, no zone is created.
+
+    Args:
+        batch: Zones to create
+
+    Returns:
+        Created zones
+
+    Raises:
+        400: A zone ID already exists or is repeated in the batch
+        422: Invalid request body
+    """
+    logger.debug("create_zones called with %s zones", len(batch.zones))
+
+    storage.create_zones(batch.zones)
+    logger.info("Zones created: count=%s", len(batch.zones))
+
+    return batch.zones
 
 
 @router.get("/zones", response_model=list[ZoneBase], tags=["Zones"])
 async def list_zones(
+    request: Request,
     active: bool | None = None,
     borough: str | None = None,
 ):
@@ -85,16 +107,20 @@ async def list_zones(
         borough: Filter by borough name
 
     Returns:
-        List of zones matching filters
+        List of zones matching filters, or 304 when the client's
+        If-None-Match still matches
     """
-    logger.debug(
-        f"list_zones called with filters active={active} borough={borough}"
-    )
+    logger.debug("list_zones called with filters active=%s borough=%s", active, borough)
+
+    if active is None and not borough:
+        # Unfiltered list is served from the body cached in storage
+        logger.info("list_zones returning all zones")
+        return json_list_response(request, storage.get_all_zones_json())
 
     result = storage.get_all_zones(active, borough)
-    logger.info(f"list_zones returning {len(result)} zones")
+    logger.info("list_zones returning %s zones", len(result))
 
-    return result
+    return json_list_response(request, ZONE_LIST_ADAPTER.dump_json(result))
 
 
 @router.get("/zones/{zone_id}", response_model=ZoneBase, tags=["Zones"])
@@ -111,29 +137,18 @@ async def get_zone(zone_id: int):
     Raises:
         404: Zone not found
     """
-    logger.debug(f"get_zone called for id={zone_id}")
-
-    try:
-        result = storage.get_zone(zone_id)
-        if result:
-            logger.info(f"Zone retrieved: id={result.id} name={result.zone_name}")
-
-            return result
-        else:
-            logger.info(f"Zone not found: id={zone_id}")
-
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="zone not found"
-            )
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except Exception as exc:
-        logger.exception(f"get_zone unexpected error: {exc}")
+    logger.debug("get_zone called for id=%s", zone_id)
+
+    result = storage.get_zone(zone_id)
+    if result:
+        logger.info("Zone retrieved: id=%s name=%s", result.id, result.zone_name)
+
+        return result
+    else:
+        logger.info("Zone not found: id=%s", zone_id)
 
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="internal server error",
+            status_code=status.HTTP_404_NOT_FOUND, detail="zone not found"
         )
 
 
@@ -153,45 +168,29 @@ async def update_zone(zone_id: int, zone: ZoneBase):
         400: Validation errors (empty fields, invalid ID)
         404: Zone not found
     """
-    logger.debug(f"update_zone called for id={zone_id} payload_id={zone.id}")
-
-    try:
-        # Verify zone exists before updating
-        if not storage.zone_exists(zone_id):
-            logger.warning(f"Attempted to update non-existent zone: id={zone_id}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="zone not found"
-            )
-
-        # Verify zone_id matches payload
-        if zone_id != zone.id:
-            logger.warning(
-                f"Zone ID mismatch: URL id={zone_id}, payload id={zone.id}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Zone ID mismatch: URL id={zone_id}, payload id={zone.id}"
-            )
-
-        storage.update_zone(zone)
-        logger.info(f"Zone updated: id={zone_id} name={zone.zone_name}")
-
-        return zone
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except ValueError as ve:
-        logger.warning(f"update_zone failed validation: {ve}")
-
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
-    except Exception as exc:
-        logger.exception(f"update_zone unexpected error: {exc}")
+    logger.debug("update_zone called for id=%s payload_id=%s", zone_id, zone.id)
 
+    # Verify zone_id matches payload
+    if zone_id != zone.id:
+        logger.warning(
+            "Zone ID mismatch: URL id=%s, payload id=%s",
+            zone_id, zone.id,
+        )
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="internal server error",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Zone ID mismatch: URL id={zone_id}, payload id={zone.id}"
         )
 
+    # Existence is checked by the same lookup that stores the update
+    if not storage.update_zone(zone):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="zone not found"
+        )
+
+    logger.info("Zone updated: id=%s name=%s", zone_id, zone.zone_name)
+
+    return zone
+
 
 @router.delete(
     "/zones/{zone_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Zones"]
@@ -209,26 +208,16 @@ async def delete_zone(zone_id: int):
     Raises:
         404: Zone not found
     """
-    logger.debug(f"delete_zone called for id={zone_id}")
-
-    try:
-        deleted = storage.delete_zone(zone_id)
-        if deleted:
-            logger.info(f"Zone deleted: id={zone_id}")
-
-            return
-        else:
-            logger.warning(f"Attempted to delete non-existent zone: id={zone_id}")
-
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="zone not found"
-            )
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except Exception as exc:
-        logger.exception(f"delete_zone unexpected error: {exc}")
+    logger.debug("delete_zone called for id=%s", zone_id)
+
+    deleted = storage.delete_zone(zone_id)
+    if deleted:
+        logger.info("Zone deleted: id=%s", zone_id)
+
+        return
+    else:
+        logger.warning("Attempted to delete non-existent zone: id=%s", zone_id)
+
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="internal server error",
+            status_code=status.HTTP_404_NOT_FOUND, detail="zone not found"
         )
@@ -6,9 +6,22 @@ enabling parallel development with type safety and validation.
 FastAPI will auto-generate OpenAPI/Swagger spec from these models.
 """
 
-from datetime import datetime
+import sys
+from datetime import datetime, timezone
 from typing import List
-from pydantic import BaseModel, Field, field_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    TypeAdapter,
+    field_validator,
+    model_validator,
+)
+
+
+def _utc_now() -> datetime:
+    """Current time in UTC, using the fixed timezone.utc instance."""
+    return datetime.now(timezone.utc)
 
 
 # =============================================================================
@@ -27,13 +40,17 @@ from pydantic import BaseModel, Field, field_validator
 class ZoneBase(BaseModel):
     """Base schema for Zone with common fields."""
 
+    # Frozen so a zone held by storage can't change behind its indexes;
+    # use model_copy(update=...) and storage.update_zone to modify one
+    model_config = ConfigDict(frozen=True)
+
     id: int = Field(..., gt=0, description="TLC LocationID, must be positive")
     borough: str = Field(..., min_length=1, description="Borough name, not empty")
     zone_name: str = Field(..., min_length=1, description="Zone name, not empty")
     service_zone: str = Field(..., description="Service zone designation")
     active: bool = Field(default=True, description="Whether zone is active")
     created_at: datetime = Field(
-        default=datetime.now(), description="Timestamp of creation"
+        default_factory=_utc_now, description="Timestamp of creation"
     )
 
     @field_validator("borough", "zone_name")
@@ -44,6 +61,24 @@ class ZoneBase(BaseModel):
             raise ValueError("Field cannot be empty or whitespace-only")
         return v.strip()
 
+    @field_validator("borough", "service_zone")
+    @classmethod
+    def intern_category(cls, v: str) -> str:
+        """Share one str object per distinct borough or service zone."""
+        # Only a handful of values each, unlike zone_name, which is unique
+        return sys.intern(v)
+
+
+class ZoneBatch(BaseModel):
+    """Schema for creating several zones in one request."""
+
+    zones: List[ZoneBase] = Field(..., description="Zones to create")
+
+
+# Serializes zone lists straight to JSON bytes with pydantic-core; shared by
+# the cached full-list body in storage and the filtered lists in routes_zones
+ZONE_LIST_ADAPTER = TypeAdapter(list[ZoneBase])
+
 
 # class ZoneCreate(ZoneBase):
 #     """Schema for creating a new Zone."""
@@ -95,6 +130,9 @@ class ZoneBase(BaseModel):
 class RouteBase(BaseModel):
     """Base schema for Route with common fields."""
 
+    # Frozen for the same reason as ZoneBase
+    model_config = ConfigDict(frozen=True)
+
     id: int = Field(..., gt=0, description="Id for the route, must be positive")
 
     pickup_zone_id: int = Field(
@@ -107,7 +145,7 @@ class RouteBase(BaseModel):
     active: bool = Field(default=True, description="Whether route is active")
 
     created_at: datetime = Field(
-        default=datetime.now(), description="Timestamp of creation"
+        default_factory=_utc_now, description="Timestamp of creation"
     )
 
     @field_validator("name")
@@ -118,13 +156,13 @@ class RouteBase(BaseModel):
             raise ValueError("Route name cannot be empty or whitespace-only")
         return v.strip()
 
-    @field_validator("dropoff_zone_id")
-    @classmethod
-    def validate_different_zones(cls, v: int, info) -> int:
+    @model_validator(mode="after")
+    def validate_different_zones(self) -> "RouteBase":
         """Ensure pickup and dropoff zones are different."""
-        if "pickup_zone_id" in info.data and v == info.data["pickup_zone_id"]:
+        # Runs once on the built model, only if both IDs passed validation
+        if self.pickup_zone_id == self.dropoff_zone_id:
             raise ValueError("pickup_zone_id and dropoff_zone_id must be different")
-        return v
+        return self
 
 
 class RouteCreate(BaseModel):
@@ -147,13 +185,18 @@ class RouteCreate(BaseModel):
             raise ValueError("Route name cannot be empty or whitespace-only")
         return v.strip()
 
-    @field_validator("dropoff_zone_id")
-    @classmethod
-    def validate_different_zones(cls, v: int, info) -> int:
+    @model_validator(mode="after")
+    def validate_different_zones(self) -> "RouteCreate":
         """Ensure pickup and dropoff zones are different."""
-        if "pickup_zone_id" in info.data and v == info.data["pickup_zone_id"]:
+        if self.pickup_zone_id == self.dropoff_zone_id:
             raise ValueError("pickup_zone_id and dropoff_zone_id must be different")
-        return v
+        return self
+
+
+class RouteBatch(BaseModel):
+    """Schema for creating several routes in one request."""
+
+    routes: List[RouteCreate] = Field(..., description="Routes to create")
 
 
 class RouteUpdate(RouteBase):
@@ -245,6 +288,31 @@ class UploadResponse(BaseModel):
         }
 
 
+class UploadJob(BaseModel):
+    """Schema for a parquet upload processed in the background."""
+
+    job_id: str = Field(..., description="Identifier to poll the job with")
+    status: str = Field(
+        ...,
+        pattern="^(pending|running|done|failed)$",
+        description="Job state: pending, running, done or failed",
+    )
+    result: UploadResponse | None = Field(
+        default=None, description="Processing summary once the job is done"
+    )
+    error: str | None = Field(default=None, description="Error message if the job failed")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "job_id": "3f2b8c1e9a0d4e6f8b7c5a4d3e2f1a0b",
+                "status": "pending",
+                "result": None,
+                "error": None,
+            }
+        }
+
+
 # =============================================================================
 # Health Check Schema
 # =============================================================================
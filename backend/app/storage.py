@@ -4,15 +4,20 @@ Storage management for in-memory parquet file handling.
 This module provides:
 - In-memory storage for Zones and Routes using dicts
 - CRUD operations for entities
-- Parquet file reading and processing
+
+Parquet reading lives in IntegrationService (integration.py), which the
+upload endpoint runs in the threadpool so it never blocks the event loop.
 
 The storage is in ram, so it doesnt survive reboots.
 """
 
+import itertools
 import logging
-
+import threading
+from collections import defaultdict
 
 from app.schemas import (
+    ZONE_LIST_ADAPTER,
     RouteBase,
     ZoneBase,
 )
@@ -29,15 +34,132 @@ class Storage:
     Attributes:
         _zones_db: Dictionary mapping zone_id -> zone_data
         _routes_db: Dictionary mapping route_id -> route_data
+        _zones_by_borough: Secondary index mapping borough -> zone ids
+        _active_zone_ids: Secondary index of the ids of active zones
+        _zone_order: Dictionary mapping zone_id -> creation sequence number
+        _routes_by_pair: Index mapping (pickup_zone_id, dropoff_zone_id) -> route ids
+        _routes_by_pickup: Secondary index mapping pickup_zone_id -> route ids
+        _routes_by_dropoff: Secondary index mapping dropoff_zone_id -> route ids
+        _active_route_ids: Secondary index of the ids of active routes
+        _route_order: Dictionary mapping route_id -> creation sequence number
+        _lock: Re-entrant lock held by writers and while reads snapshot the indexes
+        _all_zones_json: Cached JSON body of the unfiltered zone list, None when stale
     """
 
     def __init__(self):
         """
         Initialize storage with empty dictionaries.
         """
+        # Plain dicts on purpose: an int hashes to itself, so a probe here is
+        # cheaper than a bounds check plus index into an id-addressed list.
+        # They can't be presized from Python: clear() drops the hash table,
+        # and one emptied by deletes is compacted on the next growth anyway
         self._zones_db: dict[int, ZoneBase] = {}
         self._routes_db: dict[int, RouteBase] = {}
         self._id_counter = 0
+        # Keyed by the borough string itself: ZoneBase interns boroughs, so
+        # zones share one str per borough, and a borough filter is a single
+        # lookup here rather than a compare per zone
+        self._zones_by_borough: defaultdict[str, set[int]] = defaultdict(set)
+        self._active_zone_ids: set[int] = set()
+        self._zone_order: dict[int, int] = {}
+        self._zone_sequence = itertools.count()
+        # Route indexes hold ids, not records, so _routes_db keeps the only
+        # reference to each stored route
+        self._routes_by_pair: defaultdict[tuple[int, int], set[int]] = defaultdict(set)
+        self._routes_by_pickup: defaultdict[int, set[int]] = defaultdict(set)
+        self._routes_by_dropoff: defaultdict[int, set[int]] = defaultdict(set)
+        self._active_route_ids: set[int] = set()
+        self._route_order: dict[int, int] = {}
+        self._route_sequence = itertools.count()
+        self._lock = threading.RLock()
+        self._all_zones_json: bytes | None = None
+
+    @property
+    def lock(self) -> threading.RLock:
+        """
+        The re-entrant lock every storage write holds.
+
+        Hold it to make a read-modify-write over several storage calls
+        atomic, e.g. an upload checking what exists before creating it.
+        """
+        return self._lock
+
+    # Zone Indexes
+
+    def _index_zone(self, zone: ZoneBase):
+        """
+        Add a zone to the borough/active indexes.
+
+        Every zone write goes through here, so it also drops the cached
+        zone list JSON.
+
+        Args:
+            zone: ZoneBase schema as currently stored
+        """
+        self._all_zones_json = None
+        self._zone_order.setdefault(zone.id, next(self._zone_sequence))
+        self._zones_by_borough[zone.borough].add(zone.id)
+        if zone.active:
+            self._active_zone_ids.add(zone.id)
+
+    def _unindex_zone(self, zone_id: int):
+        """
+        Remove a stored zone from the borough/active indexes.
+
+        Must run before the zone is replaced or deleted, since its current
+        borough is read from storage. Also drops the cached zone list JSON.
+
+        Args:
+            zone_id: The ID of a zone currently in storage
+        """
+        self._all_zones_json = None
+        borough = self._zones_db[zone_id].borough
+        zone_ids = self._zones_by_borough[borough]
+        zone_ids.discard(zone_id)
+        if not zone_ids:
+            del self._zones_by_borough[borough]
+        self._active_zone_ids.discard(zone_id)
+
+    # Route Indexes
+
+    def _index_route(self, route: RouteBase):
+        """
+        Add a route to the pair/pickup/dropoff/active indexes.
+
+        Args:
+            route: RouteBase schema as currently stored
+        """
+        self._route_order.setdefault(route.id, next(self._route_sequence))
+        self._routes_by_pair[(route.pickup_zone_id, route.dropoff_zone_id)].add(route.id)
+        self._routes_by_pickup[route.pickup_zone_id].add(route.id)
+        self._routes_by_dropoff[route.dropoff_zone_id].add(route.id)
+        if route.active:
+            self._active_route_ids.add(route.id)
+
+    def _unindex_route(self, route_id: int):
+        """
+        Remove a stored route from the pair/pickup/dropoff/active indexes.
+
+        Its creation sequence number is kept, so an update keeps its place.
+
+        Args:
+            route_id: The ID of a route currently in storage
+        """
+        route = self._routes_db[route_id]
+        pair = (route.pickup_zone_id, route.dropoff_zone_id)
+        route_ids = self._routes_by_pair[pair]
+        route_ids.discard(route_id)
+        if not route_ids:
+            del self._routes_by_pair[pair]
+        for index, zone_id in (
+            (self._routes_by_pickup, route.pickup_zone_id),
+            (self._routes_by_dropoff, route.dropoff_zone_id),
+        ):
+            index[zone_id].discard(route_id)
+            if not index[zone_id]:
+                del index[zone_id]
+        self._active_route_ids.discard(route_id)
 
     # Zone Operations (CRUD)
 
@@ -51,14 +173,40 @@ class Storage:
         Raises:
             ValueError: If the id is already in the storage
         """
-        if zone.id in self._zones_db:
-            logger.warning(f"Attempted to create zone with duplicate ID: {zone.id}")
-            raise ValueError("Value already exists")
-        else:
-            self._zones_db[zone.id] = zone
-            logger.info(
-                f"Zone created: id={zone.id}, borough={zone.borough}, zone_name={zone.zone_name}"
-            )
+        with self._lock:
+            if zone.id in self._zones_db:
+                logger.warning("Attempted to create zone with duplicate ID: %s", zone.id)
+                raise ValueError("Value already exists")
+            else:
+                self._zones_db[zone.id] = zone
+                self._index_zone(zone)
+                logger.info(
+                    "Zone created: id=%s, borough=%s, zone_name=%s",
+                    zone.id, zone.borough, zone.zone_name,
+                )
+
+    def create_zones(self, zones: list[ZoneBase]):
+        """
+        Create several zones in storage at once.
+
+        Either all zones are created or none are.
+
+        Args:
+            zones: List of ZoneBase schemas containing zone data
+
+        Raises:
+            ValueError: If any id is already in the storage or repeated in zones
+        """
+        with self._lock:
+            new_ids = {zone.id for zone in zones}
+            if len(new_ids) != len(zones) or not new_ids.isdisjoint(self._zones_db):
+                logger.warning("Attempted to create zones with duplicate IDs")
+                raise ValueError("Value already exists")
+
+            self._zones_db.update((zone.id, zone) for zone in zones)
+            for zone in zones:
+                self._index_zone(zone)
+            logger.info("Zones created: count=%s", len(zones))
 
     def get_zone(self, zone_id: int) -> ZoneBase | None:
         """
@@ -71,10 +219,13 @@ class Storage:
             ZoneBase: The zone if found, None otherwise
         """
         zone = self._zones_db.get(zone_id)
-        if zone:
-            logger.debug(f"Zone retrieved: id={zone_id}")
-        else:
-            logger.debug(f"Zone not found: id={zone_id}")
+        # Single-key reads are the hottest path, so skip the logging calls
+        # entirely unless DEBUG is on
+        if logger.isEnabledFor(logging.DEBUG):
+            if zone:
+                logger.debug("Zone retrieved: id=%s", zone_id)
+            else:
+                logger.debug("Zone not found: id=%s", zone_id)
         return zone
 
     def get_all_zones(
@@ -92,28 +243,69 @@ class Storage:
         Returns:
             List[ZoneBase]: List of matching zones, ordered by creation time
         """
-        ret = list(self._zones_db.values())
-        if active is not None:
-            ret = [i for i in ret if i.active == active]
-        if borough:
-            ret = [i for i in ret if i.borough == borough]
-
-        logger.debug(
-            f"Retrieved {len(ret)} zones with filters: active={active}, borough={borough}"
-        )
+        with self._lock:
+            if active is None and not borough:
+                ret = list(self._zones_db.values())
+            else:
+                # Start from the narrowest index set so the full key set is
+                # only walked when the filter needs it (active=False alone)
+                ids = self._zones_by_borough.get(borough, set()) if borough else None
+                if active is True:
+                    ids = self._active_zone_ids if ids is None else ids & self._active_zone_ids
+                elif active is False:
+                    ids = (self._zones_db.keys() if ids is None else ids) - self._active_zone_ids
+                ret = [
+                    self._zones_db[i]
+                    for i in sorted(ids, key=self._zone_order.__getitem__)
+                ]
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Retrieved %s zones with filters: active=%s, borough=%s",
+                len(ret), active, borough,
+            )
         return ret
 
-    def update_zone(self, zone: ZoneBase):
+    def get_all_zones_json(self) -> bytes:
+        """
+        Retrieve all zones serialized as a JSON array.
+
+        The body is built once and reused until the next zone write.
+
+        Returns:
+            bytes: JSON array of all zones, ordered by creation time
+        """
+        with self._lock:
+            if self._all_zones_json is None:
+                self._all_zones_json = ZONE_LIST_ADAPTER.dump_json(
+                    list(self._zones_db.values())
+                )
+                logger.debug("Zone list JSON rebuilt for %s zones", len(self._zones_db))
+            return self._all_zones_json
+
+    def update_zone(self, zone: ZoneBase) -> bool:
         """
         Update a zone by ID.
 
         Args:
             zone: ZoneBase schema with new zone data. The zone.id determines which zone to update.
+
+        Returns:
+            bool: True if updated successfully, False if zone.id not found
         """
-        self._zones_db[zone.id] = zone
-        logger.info(
-            f"Zone updated: id={zone.id}, borough={zone.borough}, zone_name={zone.zone_name}"
-        )
+        with self._lock:
+            if zone.id not in self._zones_db:
+                logger.warning("Attempted to update non-existent zone: id=%s", zone.id)
+                return False
+
+            self._unindex_zone(zone.id)
+            self._zones_db[zone.id] = zone
+            self._index_zone(zone)
+            logger.info(
+                "Zone updated: id=%s, borough=%s, zone_name=%s",
+                zone.id, zone.borough, zone.zone_name,
+            )
+            return True
 
     def delete_zone(self, zone_id: int) -> bool:
         """
@@ -125,13 +317,16 @@ class Storage:
         Returns:
             bool: True if deleted successfully, False if zone_id not found
         """
-        if zone_id in self._zones_db:
-            del self._zones_db[zone_id]
-            logger.info(f"Zone deleted: id={zone_id}")
-            return True
+        with self._lock:
+            if zone_id in self._zones_db:
+                self._unindex_zone(zone_id)
+                del self._zones_db[zone_id]
+                del self._zone_order[zone_id]
+                logger.info("Zone deleted: id=%s", zone_id)
+                return True
 
-        logger.warning(f"Attempted to delete non-existent zone: id={zone_id}")
-        return False
+            logger.warning("Attempted to delete non-existent zone: id=%s", zone_id)
+            return False
 
     def zone_exists(self, zone_id: int) -> bool:
         """
@@ -158,29 +353,80 @@ class Storage:
             ValueError: If pickup_zone_id == dropoff_zone_id, zones don't exist, or value already exists
         """
 
-        if route.id in self._routes_db:
-            logger.warning(f"Attempted to create route with duplicate ID: {route.id}")
-            raise ValueError("Value already exists")
-        elif route.pickup_zone_id == route.dropoff_zone_id:
-            logger.warning(
-                f"Attempted to create route with same pickup/dropoff: {route.pickup_zone_id}"
-            )
-            raise ValueError("pickup_zone_id == dropoff_zone_id")
-        elif route.dropoff_zone_id not in self._zones_db:
-            logger.warning(
-                f"Attempted to create route with non-existent dropoff zone: {route.dropoff_zone_id}"
-            )
-            raise ValueError("dropoff_zone_id not in zones")
-        elif route.pickup_zone_id not in self._zones_db:
-            logger.warning(
-                f"Attempted to create route with non-existent pickup zone: {route.pickup_zone_id}"
-            )
-            raise ValueError("pickup_zone_id not in zones")
-        else:
-            self._routes_db[route.id] = route
-            logger.info(
-                f"Route created: id={route.id}, pickup={route.pickup_zone_id}, dropoff={route.dropoff_zone_id}, name={route.name}"
-            )
+        with self._lock:
+            if route.id in self._routes_db:
+                logger.warning("Attempted to create route with duplicate ID: %s", route.id)
+                raise ValueError("Value already exists")
+            elif route.pickup_zone_id == route.dropoff_zone_id:
+                logger.warning(
+                    "Attempted to create route with same pickup/dropoff: %s",
+                    route.pickup_zone_id,
+                )
+                raise ValueError("pickup_zone_id == dropoff_zone_id")
+            elif route.dropoff_zone_id not in self._zones_db:
+                logger.warning(
+                    "Attempted to create route with non-existent dropoff zone: %s",
+                    route.dropoff_zone_id,
+                )
+                raise ValueError("dropoff_zone_id not in zones")
+            elif route.pickup_zone_id not in self._zones_db:
+                logger.warning(
+                    "Attempted to create route with non-existent pickup zone: %s",
+                    route.pickup_zone_id,
+                )
+                raise ValueError("pickup_zone_id not in zones")
+            else:
+                self._routes_db[route.id] = route
+                self._index_route(route)
+                logger.info(
+                    "Route created: id=%s, pickup=%s, dropoff=%s, name=%s",
+                    route.id, route.pickup_zone_id, route.dropoff_zone_id, route.name,
+                )
+
+    def create_routes(self, routes: list[RouteBase]):
+        """
+        Create several routes in storage at once.
+
+        Either all routes are created or none are.
+
+        Args:
+            routes: List of RouteBase schemas containing route data
+
+        Raises:
+            ValueError: If any id is already in the storage or repeated in routes,
+                any pickup_zone_id == dropoff_zone_id, or any zone doesn't exist
+        """
+        with self._lock:
+            new_ids = {route.id for route in routes}
+            if len(new_ids) != len(routes) or not new_ids.isdisjoint(self._routes_db):
+                logger.warning("Attempted to create routes with duplicate IDs")
+                raise ValueError("Value already exists")
+            # Local alias avoids repeated attribute lookups in the loop
+            zones = self._zones_db
+            for route in routes:
+                if route.pickup_zone_id == route.dropoff_zone_id:
+                    logger.warning(
+                        "Attempted to create route with same pickup/dropoff: %s",
+                        route.pickup_zone_id,
+                    )
+                    raise ValueError("pickup_zone_id == dropoff_zone_id")
+                if route.dropoff_zone_id not in zones:
+                    logger.warning(
+                        "Attempted to create route with non-existent dropoff zone: %s",
+                        route.dropoff_zone_id,
+                    )
+                    raise ValueError("dropoff_zone_id not in zones")
+                if route.pickup_zone_id not in zones:
+                    logger.warning(
+                        "Attempted to create route with non-existent pickup zone: %s",
+                        route.pickup_zone_id,
+                    )
+                    raise ValueError("pickup_zone_id not in zones")
+
+            self._routes_db.update((route.id, route) for route in routes)
+            for route in routes:
+                self._index_route(route)
+            logger.info("Routes created: count=%s", len(routes))
 
     def get_route(self, route_id: int) -> RouteBase | None:
         """
@@ -193,10 +439,11 @@ class Storage:
             RouteBase: The route if found, None otherwise
         """
         route = self._routes_db.get(route_id)
-        if route:
-            logger.debug(f"Route retrieved: id={route_id}")
-        else:
-            logger.debug(f"Route not found: id={route_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            if route:
+                logger.debug("Route retrieved: id=%s", route_id)
+            else:
+                logger.debug("Route not found: id=%s", route_id)
         return route
 
     def get_all_routes(
@@ -216,17 +463,34 @@ class Storage:
         Returns:
             List[RouteBase]: List of matching routes, ordered by creation time
         """
-        ret = list(self._routes_db.values())
-        if active is not None:
-            ret = [i for i in ret if active == i.active]
-        if pickup_zone_id:
-            ret = [i for i in ret if i.pickup_zone_id == pickup_zone_id]
-        if dropoff_zone_id:
-            ret = [i for i in ret if i.dropoff_zone_id == dropoff_zone_id]
-
-        logger.debug(
-            f"Retrieved {len(ret)} routes with filters: active={active}, pickup={pickup_zone_id}, dropoff={dropoff_zone_id}"
-        )
+        with self._lock:
+            if active is None and not pickup_zone_id and not dropoff_zone_id:
+                ret = list(self._routes_db.values())
+            else:
+                # Same approach as get_all_zones: intersect index sets and
+                # only fall back to every route id for active=False alone
+                ids = None
+                for zone_id, index in (
+                    (pickup_zone_id, self._routes_by_pickup),
+                    (dropoff_zone_id, self._routes_by_dropoff),
+                ):
+                    if zone_id:
+                        matches = index.get(zone_id, set())
+                        ids = matches if ids is None else ids & matches
+                if active is True:
+                    ids = self._active_route_ids if ids is None else ids & self._active_route_ids
+                elif active is False:
+                    ids = (self._routes_db.keys() if ids is None else ids) - self._active_route_ids
+                ret = [
+                    self._routes_db[i]
+                    for i in sorted(ids, key=self._route_order.__getitem__)
+                ]
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Retrieved %s routes with filters: active=%s, pickup=%s, dropoff=%s",
+                len(ret), active, pickup_zone_id, dropoff_zone_id,
+            )
         return ret
 
     def find_route_by_zones(
@@ -244,20 +508,27 @@ class Storage:
         Returns:
             RouteBase: The route if found, None otherwise
         """
-        for value in self._routes_db.values():
-            if (
-                value.pickup_zone_id == pickup_zone_id
-                and value.dropoff_zone_id == dropoff_zone_id
-            ):
+        with self._lock:
+            # .get so a miss doesn't add an empty entry to the defaultdict
+            route_ids = self._routes_by_pair.get((pickup_zone_id, dropoff_zone_id))
+            # Oldest route of the pair, i.e. the first one _routes_db yields;
+            # an update keeps a route's creation sequence number
+            value = (
+                self._routes_db[min(route_ids, key=self._route_order.__getitem__)]
+                if route_ids else None
+            )
+        if logger.isEnabledFor(logging.DEBUG):
+            if value is not None:
                 logger.debug(
-                    f"Route found for zone pair: pickup={pickup_zone_id}, dropoff={dropoff_zone_id}, route_id={value.id}"
+                    "Route found for zone pair: pickup=%s, dropoff=%s, route_id=%s",
+                    pickup_zone_id, dropoff_zone_id, value.id,
                 )
-                return value
-
-        logger.debug(
-            f"Route not found for zone pair: pickup={pickup_zone_id}, dropoff={dropoff_zone_id}"
-        )
-        return None
+            else:
+                logger.debug(
+                    "Route not found for zone pair: pickup=%s, dropoff=%s",
+                    pickup_zone_id, dropoff_zone_id,
+                )
+        return value
 
     def update_route(self, route_id: int, route: RouteBase):
         """
@@ -271,31 +542,40 @@ class Storage:
             ValueError: If pickup_zone_id == dropoff_zone_id or zones don't exist or route_id != route.id
         """
 
-        if route.pickup_zone_id == route.dropoff_zone_id:
-            logger.warning(
-                f"Attempted to update route with same pickup/dropoff: {route.pickup_zone_id}"
-            )
-            raise ValueError("pickup_zone_id == dropoff_zone_id")
-        elif route.dropoff_zone_id not in self._zones_db:
-            logger.warning(
-                f"Attempted to update route with non-existent dropoff zone: {route.dropoff_zone_id}"
-            )
-            raise ValueError("dropoff_zone_id not in zones")
-        elif route.pickup_zone_id not in self._zones_db:
-            logger.warning(
-                f"Attempted to update route with non-existent pickup zone: {route.pickup_zone_id}"
-            )
-            raise ValueError("pickup_zone_id not in zones")
-        elif route_id != route.id:
-            logger.warning(
-                f"Attempted to update route with mismatched IDs: route_id={route_id}, route.id={route.id}"
-            )
-            raise ValueError("route_id != route.id")
-        else:
-            self._routes_db[route_id] = route
-            logger.info(
-                f"Route updated: id={route_id}, pickup={route.pickup_zone_id}, dropoff={route.dropoff_zone_id}, name={route.name}"
-            )
+        with self._lock:
+            if route.pickup_zone_id == route.dropoff_zone_id:
+                logger.warning(
+                    "Attempted to update route with same pickup/dropoff: %s",
+                    route.pickup_zone_id,
+                )
+                raise ValueError("pickup_zone_id == dropoff_zone_id")
+            elif route.dropoff_zone_id not in self._zones_db:
+                logger.warning(
+                    "Attempted to update route with non-existent dropoff zone: %s",
+                    route.dropoff_zone_id,
+                )
+                raise ValueError("dropoff_zone_id not in zones")
+            elif route.pickup_zone_id not in self._zones_db:
+                logger.warning(
+                    "Attempted to update route with non-existent pickup zone: %s",
+                    route.pickup_zone_id,
+                )
+                raise ValueError("pickup_zone_id not in zones")
+            elif route_id != route.id:
+                logger.warning(
+                    "Attempted to update route with mismatched IDs: route_id=%s, route.id=%s",
+                    route_id, route.id,
+                )
+                raise ValueError("route_id != route.id")
+            else:
+                if route_id in self._routes_db:
+                    self._unindex_route(route_id)
+                self._routes_db[route_id] = route
+                self._index_route(route)
+                logger.info(
+                    "Route updated: id=%s, pickup=%s, dropoff=%s, name=%s",
+                    route_id, route.pickup_zone_id, route.dropoff_zone_id, route.name,
+                )
 
     def delete_route(self, route_id: int) -> bool:
         """
@@ -307,13 +587,16 @@ class Storage:
         Returns:
             bool: True if deleted successfully, False if route_id not found
         """
-        if route_id in self._routes_db:
-            del self._routes_db[route_id]
-            logger.info(f"Route deleted: id={route_id}")
-            return True
+        with self._lock:
+            if route_id in self._routes_db:
+                self._unindex_route(route_id)
+                del self._routes_db[route_id]
+                del self._route_order[route_id]
+                logger.info("Route deleted: id=%s", route_id)
+                return True
 
-        logger.warning(f"Attempted to delete non-existent route: id={route_id}")
-        return False
+            logger.warning("Attempted to delete non-existent route: id=%s", route_id)
+            return False
 
     def route_exists(self, route_id: int) -> bool:
         """
@@ -336,10 +619,20 @@ class Storage:
         This method resets both zones and routes to empty state.
         Use with caution in production.
         """
-        self._routes_db.clear()
-        self._zones_db.clear()
-        self._id_counter = 0
-        logger.info("Storage cleared: all zones and routes removed")
+        with self._lock:
+            self._routes_db.clear()
+            self._zones_db.clear()
+            self._zones_by_borough.clear()
+            self._active_zone_ids.clear()
+            self._zone_order.clear()
+            self._all_zones_json = None
+            self._routes_by_pair.clear()
+            self._routes_by_pickup.clear()
+            self._routes_by_dropoff.clear()
+            self._active_route_ids.clear()
+            self._route_order.clear()
+            self._id_counter = 0
+            logger.info("Storage cleared: all zones and routes removed")
 
     def get_storage_stats(self) -> dict[str, int]:
         """
@@ -348,12 +641,14 @@ class Storage:
         Returns:
             dict: Dictionary with keys 'zones_count', 'routes_count'
         """
-        stats = {
-            "zones_count": len(self._zones_db.keys()),
-            "routes_count": len(self._routes_db.keys()),
-        }
-        logger.debug(f"Storage stats: {stats}")
-        return stats
+        with self._lock:
+            stats = {
+                "zones_count": len(self._zones_db),
+                "routes_count": len(self._routes_db),
+            }
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Storage stats: %s", stats)
+            return stats
 
     def assign_route_id(self) -> int:
         """
@@ -362,8 +657,24 @@ class Storage:
         Returns:
             ID to assign
         """
-        self._id_counter += 1
-        return self._id_counter
+        with self._lock:
+            self._id_counter += 1
+            return self._id_counter
+
+    def reserve_route_ids(self, count: int) -> range:
+        """
+        Reserve a block of consecutive route IDs in one call.
+
+        Args:
+            count: Number of IDs to reserve
+
+        Returns:
+            range of the reserved IDs
+        """
+        with self._lock:
+            start = self._id_counter + 1
+            self._id_counter += count
+            return range(start, self._id_counter + 1)
 
 
 _storage_global = Storage()
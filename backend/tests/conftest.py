@@ -0,0 +1,25 @@
+"""
+Shared pytest fixtures.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.algorithm import warm_up_kernels
+from app.main import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    Create one test client for the FastAPI app, shared by every test.
+
+    The client is entered once so the app's lifespan runs a single time
+    for the whole session. The kernels are warmed up on the main thread
+    first: the lifespan runs on the client's portal thread, and a first
+    parallel Numba launch from a non-main thread hangs the TBB layer at
+    interpreter exit.
+    """
+    warm_up_kernels()
+    with TestClient(app) as test_client:
+        yield test_client
@@ -4,13 +4,20 @@ Tests for algorithm.py module.
 Tests the route optimization algorithm functions.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 import pandas as pd
 import numpy as np
+import pyarrow as pa
 from app.algorithm import (
     compute_top_routes,
+    iter_new_routes,
     optimize_route_selection,
+    split_valid_routes,
     validate_route_pair,
+    validate_route_pairs,
+    warm_up_kernels,
 )
 
 
@@ -95,6 +102,185 @@ class TestComputeTopRoutes:
 
         assert len(result) <= 5
 
+    def test_compute_top_routes_exact_counts(self):
+        """Test exact frequencies and tie ordering of the top routes."""
+        data = {
+            'PULocationID': [3, 1, 1, 2, 2, 1, 3, 3],
+            'DOLocationID': [1, 2, 2, 3, 3, 2, 1, 4]
+        }
+        df = pd.DataFrame(data)
+
+        result = compute_top_routes(df, limit_rows=100, top_n_routes=3)
+
+        assert result == [(1, 2, 3), (2, 3, 2), (3, 1, 2)]
+
+    def test_compute_top_routes_matches_groupby(self):
+        """Test that results match a plain pandas groupby on random trips."""
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({
+            'PULocationID': rng.integers(1, 266, size=5000),
+            'DOLocationID': rng.integers(1, 266, size=5000)
+        })
+
+        result = compute_top_routes(df, limit_rows=5000, top_n_routes=20)
+
+        expected = (
+            df.groupby(['PULocationID', 'DOLocationID']).size()
+            .sort_values(ascending=False, kind='stable')
+            .head(20)
+        )
+        assert [r[2] for r in result] == expected.tolist()
+
+    def test_compute_top_routes_kernel_matches_bincount(self, monkeypatch):
+        """Test that the parallel kernel and the bincount path agree."""
+        import app.algorithm as algorithm
+
+        rng = np.random.default_rng(1)
+        df = pd.DataFrame({
+            'PULocationID': rng.integers(1, 266, size=5000),
+            'DOLocationID': rng.integers(1, 266, size=5000)
+        })
+        expected = compute_top_routes(df, limit_rows=5000, top_n_routes=20)
+
+        monkeypatch.setattr(algorithm, "BINCOUNT_MAX_ROWS", 0)
+
+        assert compute_top_routes(df, limit_rows=5000, top_n_routes=20) == expected
+
+    def test_compute_top_routes_kernel_concurrent_calls(self, monkeypatch):
+        """Test that uploads counting at once from several threads all succeed."""
+        import app.algorithm as algorithm
+
+        rng = np.random.default_rng(4)
+        df = pd.DataFrame({
+            'PULocationID': rng.integers(1, 266, size=5000),
+            'DOLocationID': rng.integers(1, 266, size=5000)
+        })
+        monkeypatch.setattr(algorithm, "BINCOUNT_MAX_ROWS", 0)
+        # First launch on the main thread, as the app's lifespan does
+        expected = compute_top_routes(df, limit_rows=5000, top_n_routes=20)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(
+                lambda _: compute_top_routes(df, limit_rows=5000, top_n_routes=20),
+                range(8),
+            ))
+
+        assert results == [expected] * 8
+
+    def test_compute_top_routes_large_zone_ids(self):
+        """Test zone IDs beyond the packed-key range are still counted."""
+        data = {
+            'PULocationID': [1000, 1000, 7],
+            'DOLocationID': [2000, 2000, 8]
+        }
+        df = pd.DataFrame(data)
+
+        result = compute_top_routes(df, limit_rows=100, top_n_routes=5)
+
+        assert result[0] == (1000, 2000, 2)
+        assert len(result) == 2
+
+    def test_compute_top_routes_large_zone_ids_top_n(self):
+        """Test top-N selection and tie order on the groupby fallback path."""
+        data = {
+            'PULocationID': [1000, 1000, 1000, 900, 900, 800, 800, 700],
+            'DOLocationID': [1, 1, 1, 2, 2, 3, 3, 4]
+        }
+        df = pd.DataFrame(data)
+
+        result = compute_top_routes(df, limit_rows=100, top_n_routes=2)
+
+        assert result == [(1000, 1, 3), (800, 3, 2)]
+
+    def test_compute_top_routes_large_zone_ids_matches_groupby(self):
+        """Test that the packed np.unique count matches groupby on many rows."""
+        rng = np.random.default_rng(2)
+        df = pd.DataFrame({
+            'PULocationID': rng.integers(1, 300, size=1_000_000, dtype=np.int32) * 1000,
+            'DOLocationID': rng.integers(1, 300, size=1_000_000, dtype=np.int32)
+        })
+
+        result = compute_top_routes(df, limit_rows=1_000_000, top_n_routes=20)
+
+        expected = (
+            df.groupby(['PULocationID', 'DOLocationID']).size()
+            .sort_values(ascending=False, kind='stable')
+            .head(20)
+        )
+        assert result == [(pu, do, n) for (pu, do), n in expected.items()]
+
+    def test_compute_top_routes_negative_zone_ids(self):
+        """Test that IDs the int64 keys can't hold use the groupby fallback."""
+        df = pd.DataFrame({
+            'PULocationID': [-1, -1, 5],
+            'DOLocationID': [2, 2, 6]
+        })
+
+        result = compute_top_routes(df, limit_rows=100, top_n_routes=5)
+
+        assert result == [(-1, 2, 2), (5, 6, 1)]
+
+    def test_compute_top_routes_categorical_zone_ids(self):
+        """Test that unused categories do not show up as zero-count routes."""
+        df = pd.DataFrame({
+            'PULocationID': pd.Categorical([1000, 1000, 7], categories=[7, 900, 1000]),
+            'DOLocationID': pd.Categorical([2000, 2000, 8], categories=[8, 950, 2000])
+        })
+
+        result = compute_top_routes(df, limit_rows=100, top_n_routes=5)
+
+        assert result == [(1000, 2000, 2), (7, 8, 1)]
+
+    def test_compute_top_routes_arrow_table(self):
+        """Test that an Arrow Table gives the same result as a DataFrame."""
+        data = {
+            'PULocationID': [3, 1, 1, 2, 2, 1, 3, 3],
+            'DOLocationID': [1, 2, 2, 3, 3, 2, 1, 4]
+        }
+
+        result = compute_top_routes(pa.table(data), limit_rows=7, top_n_routes=3)
+
+        assert result == compute_top_routes(pd.DataFrame(data), 7, 3)
+
+    def test_compute_top_routes_arrow_table_large_zone_ids(self):
+        """Test the Arrow aggregation fallback for large zone IDs."""
+        data = {
+            'PULocationID': [1000, 1000, 1000, 900, 900, 800, 800, 700],
+            'DOLocationID': [1, 1, 1, 2, 2, 3, 3, 4]
+        }
+
+        result = compute_top_routes(pa.table(data), limit_rows=100, top_n_routes=2)
+
+        assert result == [(1000, 1, 3), (800, 3, 2)]
+
+    def test_compute_top_routes_drops_null_ids(self):
+        """Test that trips with a null pickup or dropoff are not counted."""
+        df = pd.DataFrame({
+            'PULocationID': [None, 4, None, 1, 1, 2],
+            'DOLocationID': [3, None, None, 2, 2, 3]
+        })
+
+        result = compute_top_routes(df, limit_rows=100, top_n_routes=5)
+
+        assert result == [(1, 2, 2), (2, 3, 1)]
+
+    def test_compute_top_routes_arrow_table_drops_null_ids(self):
+        """Test that an Arrow Table with null IDs matches the DataFrame result."""
+        data = {
+            'PULocationID': [None, 4, None, 1, 1, 2],
+            'DOLocationID': [3, None, None, 2, 2, 3]
+        }
+
+        result = compute_top_routes(pa.table(data), limit_rows=100, top_n_routes=5)
+
+        assert result == [(1, 2, 2), (2, 3, 1)]
+
+    def test_compute_top_routes_empty(self):
+        """Test that an empty dataframe yields no routes."""
+        df = pd.DataFrame({'PULocationID': [], 'DOLocationID': []}, dtype='int64')
+
+        assert compute_top_routes(df) == []
+
 
 class TestOptimizeRouteSelection:
     """Test suite for optimize_route_selection function."""
@@ -127,6 +313,53 @@ class TestOptimizeRouteSelection:
 
         assert result == []
 
+    def test_optimize_route_selection_large_zone_ids(self):
+        """Test that packed keys keep large and swapped zone IDs distinct."""
+        routes = [(70000, 1, 10), (1, 70000, 8), (300, 2, 6)]
+        existing_routes = {(70000, 1), (2, 300)}
+
+        result = optimize_route_selection(routes, existing_routes)
+
+        assert result == [(1, 70000, 8), (300, 2, 6)]
+
+    def test_optimize_route_selection_ids_past_32_bits(self):
+        """Test that IDs that would collide once packed are still told apart."""
+        routes = [(2**32 + 1, 2, 1), (1, 2, 5)]
+        existing_routes = {(1, 2)}
+
+        result = optimize_route_selection(routes, existing_routes)
+
+        assert result == [(2**32 + 1, 2, 1)]
+
+    def test_optimize_route_selection_ids_past_int64(self):
+        """Test that IDs too large for int64 fall back to the set lookup."""
+        routes = [(2**63, 2, 1)]
+        existing_routes = {(1, 2), (2, 2**63)}
+
+        result = optimize_route_selection(routes, existing_routes)
+
+        assert result == [(2**63, 2, 1)]
+
+    def test_optimize_route_selection_presence_matrix_ignores_wide_existing(self):
+        """Test that wide existing pairs don't break the small-ID presence path."""
+        routes = [(1, 2, 10), (2, 3, 8), (3, 4, 6)]
+        existing_routes = {(2, 3), (70000, 1), (-1, 4)}
+
+        result = optimize_route_selection(routes, existing_routes)
+
+        assert result == [(1, 2, 10), (3, 4, 6)]
+
+    def test_optimize_route_selection_matches_set_lookup(self):
+        """Test that the presence matrix agrees with a plain set lookup."""
+        rng = np.random.default_rng(3)
+        pairs = rng.integers(1, 266, size=(10000, 2))
+        routes = [(int(pu), int(do), 1) for pu, do in pairs]
+        existing_routes = {(int(pu), int(do)) for pu, do in pairs[::3]}
+
+        result = optimize_route_selection(routes, existing_routes)
+
+        assert result == [r for r in routes if (r[0], r[1]) not in existing_routes]
+
     def test_optimize_route_selection_empty_input(self):
         """Test with empty input routes."""
         routes = []
@@ -137,6 +370,20 @@ class TestOptimizeRouteSelection:
         assert result == []
 
 
+class TestIterNewRoutes:
+    """Test suite for iter_new_routes function."""
+
+    def test_iter_new_routes_filters_lazily(self):
+        """Test that existing pairs are skipped without building a list."""
+        routes = [(1, 2, 10), (2, 3, 8), (3, 4, 6)]
+        existing_routes = {(2, 3): "route"}
+
+        result = iter_new_routes(routes, existing_routes)
+
+        assert not isinstance(result, list)
+        assert list(result) == [(1, 2, 10), (3, 4, 6)]
+
+
 class TestValidateRoutePair:
     """Test suite for validate_route_pair function."""
 
@@ -164,4 +411,52 @@ class TestValidateRoutePair:
     def test_validate_route_pair_both_negative(self):
         """Test invalid route pairs with both zones negative."""
         assert validate_route_pair(-1, -2) is False
-        assert validate_route_pair(0, 0) is False
\ No newline at end of file
+        assert validate_route_pair(0, 0) is False
+
+
+class TestValidateRoutePairs:
+    """Test suite for validate_route_pairs function."""
+
+    def test_validate_route_pairs_matches_scalar(self):
+        """Test that the array form agrees with validate_route_pair."""
+        pickup = np.array([1, 1, -1, 0, 5, 100])
+        dropoff = np.array([2, 1, 2, 3, -5, 200])
+
+        result = validate_route_pairs(pickup, dropoff)
+
+        assert result.dtype == bool
+        assert result.tolist() == [
+            validate_route_pair(int(pu), int(do)) for pu, do in zip(pickup, dropoff)
+        ]
+
+
+class TestSplitValidRoutes:
+    """Test suite for split_valid_routes function."""
+
+    def test_split_valid_routes_mixed(self):
+        """Test that invalid pairs are separated and order is preserved."""
+        routes = [(1, 2, 10), (3, 3, 8), (0, 4, 6), (4, 5, 5), (6, -1, 2)]
+
+        valid, invalid = split_valid_routes(routes)
+
+        assert valid == [(1, 2, 10), (4, 5, 5)]
+        assert invalid == [(3, 3, 8), (0, 4, 6), (6, -1, 2)]
+
+    def test_split_valid_routes_empty_input(self):
+        """Test with empty input routes."""
+        assert split_valid_routes([]) == ([], [])
+
+
+class TestWarmUpKernels:
+    """Test suite for warm_up_kernels function."""
+
+    def test_warm_up_kernels_compiles_int16_signature(self):
+        """Test that warming up compiles the int16 counting kernel."""
+        from app.algorithm import _count_pairs
+
+        warm_up_kernels()
+
+        assert any(
+            str(signature[0]).startswith("array(int16")
+            for signature in _count_pairs.signatures
+        )
@@ -4,20 +4,67 @@ Tests for API endpoints.
 Tests the FastAPI endpoints for zones, routes, and uploads.
 """
 
+import io
+import json
+
+import httpx
+import pandas as pd
 import pytest
+from pydantic import ValidationError
 from fastapi.testclient import TestClient
+from app import routes_uploads
 from app.main import app
-from app.schemas import ZoneBase, RouteBase
+from app.schemas import ZoneBase, RouteBase, RouteCreate, UploadJob
+from app.storage import get_global_storage
+
+
+ZONE_MANHATTAN = {
+    "id": 1,
+    "borough": "Manhattan",
+    "zone_name": "Central Park",
+    "service_zone": "Yellow",
+    "active": True
+}
+ZONE_BROOKLYN = {
+    "id": 2,
+    "borough": "Brooklyn",
+    "zone_name": "Brooklyn Bridge",
+    "service_zone": "Yellow",
+    "active": True
+}
+ROUTE_1_2 = {
+    "pickup_zone_id": 1,
+    "dropoff_zone_id": 2,
+    "name": "Route 1 to 2",
+    "active": True
+}
+
+# Bodies for the payloads posted unchanged, encoded once instead of per call
+JSON_HEADERS = {"content-type": "application/json"}
+ZONE_MANHATTAN_BODY = json.dumps(ZONE_MANHATTAN).encode()
+ZONE_BROOKLYN_BODY = json.dumps(ZONE_BROOKLYN).encode()
+ROUTE_1_2_BODY = json.dumps(ROUTE_1_2).encode()
+
+# Paths hit by many tests, parsed once
+URL_ZONES = httpx.URL("/zones")
+URL_ZONE_1 = httpx.URL("/zones/1")
+URL_ROUTES = httpx.URL("/routes")
+URL_ROUTE_1 = httpx.URL("/routes/1")
+
+
+@pytest.fixture(autouse=True)
+def reset_storage():
+    """Clear storage before each test."""
+    get_global_storage().clear_all()
 
 
 @pytest.fixture
-def client():
-    """Create test client for FastAPI app."""
-    from app.storage import get_global_storage
-    # Clear storage before each test
-    storage = get_global_storage()
-    storage.clear_all()
-    return TestClient(app)
+def seeded_zones():
+    """Store zones 1 and 2 directly, without going through the API."""
+    get_global_storage().create_zones([
+        ZoneBase(id=1, borough="A", zone_name="Z1", service_zone="S", active=True),
+        ZoneBase(id=2, borough="B", zone_name="Z2", service_zone="S", active=True),
+    ])
 
 
 class TestHealthEndpoint:
@@ -36,15 +83,7 @@ class TestZonesEndpoints:
 
     def test_create_zone_success(self, client):
         """Test creating a zone successfully."""
-        zone_data = {
-            "id": 1,
-            "borough": "Manhattan",
-            "zone_name": "Central Park",
-            "service_zone": "Yellow",
-            "active": True
-        }
-
-        response = client.post("/zones", json=zone_data)
+        response = client.post(URL_ZONES, content=ZONE_MANHATTAN_BODY, headers=JSON_HEADERS)
 
         assert response.status_code == 201
         response_data = response.json()
@@ -57,84 +96,108 @@ class TestZonesEndpoints:
 
     def test_create_zone_duplicate_id(self, client):
         """Test creating zone with duplicate ID returns 400."""
-        zone_data = {
-            "id": 1,
-            "borough": "Manhattan",
-            "zone_name": "Central Park",
-            "service_zone": "Yellow",
-            "active": True
-        }
-
         # Create first zone
-        client.post("/zones", json=zone_data)
+        client.post(URL_ZONES, content=ZONE_MANHATTAN_BODY, headers=JSON_HEADERS)
 
         # Try to create duplicate
-        response = client.post("/zones", json=zone_data)
+        response = client.post(URL_ZONES, content=ZONE_MANHATTAN_BODY, headers=JSON_HEADERS)
 
         assert response.status_code == 400
         assert "Value already exists" in response.json()["detail"]
 
     def test_create_zone_invalid_data(self, client):
-        """Test creating zone with invalid data returns 422."""
-        zone_data = {
-            "id": -1,  # Invalid: must be positive
-            "borough": "",  # Invalid: cannot be empty
-            "zone_name": "Central Park",
-            "service_zone": "Yellow",
-            "active": True
-        }
+        """Test that FastAPI surfaces schema validation errors as 422."""
+        # Invalid: id must be positive and borough cannot be empty
+        zone_data = {**ZONE_MANHATTAN, "id": -1, "borough": ""}
 
-        response = client.post("/zones", json=zone_data)
+        response = client.post(URL_ZONES, json=zone_data)
 
         assert response.status_code == 422
 
+    def test_create_zones_batch_success(self, client):
+        """Test creating several zones in one request."""
+        batch = {
+            "zones": [
+                {"id": 1, "borough": "Manhattan", "zone_name": "Central Park", "service_zone": "Yellow"},
+                {"id": 2, "borough": "Queens", "zone_name": "JFK Airport", "service_zone": "Airports"},
+            ]
+        }
+
+        response = client.post("/zones/batch", json=batch)
+
+        assert response.status_code == 201
+        assert [zone["id"] for zone in response.json()] == [1, 2]
+        assert len(client.get(URL_ZONES).json()) == 2
+
+    def test_create_zones_batch_duplicate_id(self, client):
+        """Test that a batch with an existing zone ID returns 400 and creates nothing."""
+        client.post(URL_ZONES, content=ZONE_MANHATTAN_BODY, headers=JSON_HEADERS)
+        batch = {
+            "zones": [
+                {"id": 2, "borough": "Queens", "zone_name": "JFK Airport", "service_zone": "Airports"},
+                {"id": 1, "borough": "Manhattan", "zone_name": "Midtown", "service_zone": "Yellow"},
+            ]
+        }
+
+        response = client.post("/zones/batch", json=batch)
+
+        assert response.status_code == 400
+        assert client.get("/zones/2").status_code == 404
+
     def test_list_zones_empty(self, client):
         """Test listing zones when empty."""
-        response = client.get("/zones")
+        response = client.get(URL_ZONES)
 
         assert response.status_code == 200
         assert response.json() == []
 
     def test_list_zones_with_data(self, client):
         """Test listing zones with data."""
-        zone_data = {
-            "id": 1,
-            "borough": "Manhattan",
-            "zone_name": "Central Park",
-            "service_zone": "Yellow",
-            "active": True
-        }
-        client.post("/zones", json=zone_data)
+        client.post(URL_ZONES, content=ZONE_MANHATTAN_BODY, headers=JSON_HEADERS)
 
-        response = client.get("/zones")
+        response = client.get(URL_ZONES)
 
         assert response.status_code == 200
         assert len(response.json()) == 1
         assert response.json()[0]["id"] == 1
 
+    def test_list_zones_large_response_is_gzipped(self, client):
+        """Test that a large zone list is gzip-compressed for clients that accept it."""
+        get_global_storage().create_zones([
+            ZoneBase(id=i, borough="Manhattan", zone_name=f"Zone {i}", service_zone="Yellow")
+            for i in range(1, 51)
+        ])
+
+        response = client.get(URL_ZONES, headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == 50
+
+    def test_list_zones_not_modified(self, client):
+        """Test that a matching If-None-Match gets a 304 until the zones change."""
+        client.post(URL_ZONES, content=ZONE_MANHATTAN_BODY, headers=JSON_HEADERS)
+        etag = client.get(URL_ZONES).headers["etag"]
+
+        response = client.get(URL_ZONES, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+        client.post(URL_ZONES, content=ZONE_BROOKLYN_BODY, headers=JSON_HEADERS)
+        response = client.get(URL_ZONES, headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert len(response.json()) == 2
+
     def test_list_zones_filter_active(self, client):
         """Test filtering zones by active status."""
-        # Create active zone
-        zone1 = {
-            "id": 1,
-            "borough": "Manhattan",
-            "zone_name": "Central Park",
-            "service_zone": "Yellow",
-            "active": True
-        }
-        # Create inactive zone
-        zone2 = {
-            "id": 2,
-            "borough": "Brooklyn",
-            "zone_name": "Brooklyn Bridge",
-            "service_zone": "Yellow",
-            "active": False
-        }
+        # Create one active and one inactive zone
+        client.post(URL_ZONES, content=ZONE_MANHATTAN_BODY, headers=JSON_HEADERS)
+        client.post(URL_ZONES, json={**ZONE_BROOKLYN, "active": False})
 
-        client.post("/zones", json=zone1)
-        client.post("/zones", json=zone2)
-
-        response = client.get("/zones?active=true")
+        response = client.get(URL_ZONES, params={"active": True})
 
         assert response.status_code == 200
         assert len(response.json()) == 1
@@ -142,25 +205,10 @@ class TestZonesEndpoints:
 
     def test_list_zones_filter_borough(self, client):
         """Test filtering zones by borough."""
-        zone1 = {
-            "id": 1,
-            "borough": "Manhattan",
-            "zone_name": "Central Park",
-            "service_zone": "Yellow",
-            "active": True
-        }
-        zone2 = {
-            "id": 2,
-            "borough": "Brooklyn",
-            "zone_name": "Brooklyn Bridge",
-            "service_zone": "Yellow",
-            "active": True
-        }
+        client.post(URL_ZONES, content=ZONE_MANHATTAN_BODY, headers=JSON_HEADERS)
+        client.post(URL_ZONES, content=ZONE_BROOKLYN_BODY, headers=JSON_HEADERS)
 
-        client.post("/zones", json=zone1)
-        client.post("/zones", json=zone2)
-
-        response = client.get("/zones?borough=Manhattan")
+        response = client.get(URL_ZONES, params={"borough": "Manhattan"})
 
         assert response.status_code == 200
         assert len(response.json()) == 1
@@ -168,23 +216,19 @@ class TestZonesEndpoints:
 
     def test_get_zone_exists(self, client):
         """Test getting an existing zone."""
-        zone_data = {
-            "id": 1,
-            "borough": "Manhattan",
-            "zone_name": "Central Park",
-            "service_zone": "Yellow",
-            "active": True
-        }
-        client.post("/zones", json=zone_data)
+        client.post(URL_ZONES, content=ZONE_MANHATTAN_BODY, headers=JSON_HEADERS)
 
-        response = client.get("/zones/1")
+        response = client.get(URL_ZONE_1)
 
         assert response.status_code == 200
         assert response.json()["id"] == 1
 
-    def test_get_zone_not_exists(self, client):
-        """Test getting a non-existing zone returns 404."""
-        response = client.get("/zones/999")
+    @pytest.mark.parametrize("method", ["get", "put", "delete"])
+    def test_zone_not_exists(self, client, method):
+        """Test that reading, updating or deleting a missing zone returns 404."""
+        kwargs = {"json": {**ZONE_MANHATTAN, "id": 999}} if method == "put" else {}
+
+        response = client.request(method.upper(), "/zones/999", **kwargs)
 
         assert response.status_code == 404
         assert "zone not found" in response.json()["detail"]
@@ -192,67 +236,26 @@ class TestZonesEndpoints:
     def test_update_zone_success(self, client):
         """Test updating a zone successfully."""
         # Create zone
-        zone_data = {
-            "id": 1,
-            "borough": "Manhattan",
-            "zone_name": "Central Park",
-            "service_zone": "Yellow",
-            "active": True
-        }
-        client.post("/zones", json=zone_data)
+        client.post(URL_ZONES, content=ZONE_MANHATTAN_BODY, headers=JSON_HEADERS)
 
         # Update zone
-        updated_data = {
-            "id": 1,
-            "borough": "Manhattan",
-            "zone_name": "Updated Park",
-            "service_zone": "Yellow",
-            "active": False
-        }
+        updated_data = {**ZONE_MANHATTAN, "zone_name": "Updated Park", "active": False}
 
-        response = client.put("/zones/1", json=updated_data)
+        response = client.put(URL_ZONE_1, json=updated_data)
 
         assert response.status_code == 200
         assert response.json()["zone_name"] == "Updated Park"
         assert response.json()["active"] is False
 
-    def test_update_zone_not_exists(self, client):
-        """Test updating a non-existing zone returns 404."""
-        updated_data = {
-            "id": 999,
-            "borough": "Manhattan",
-            "zone_name": "Updated Park",
-            "service_zone": "Yellow",
-            "active": False
-        }
-
-        response = client.put("/zones/999", json=updated_data)
-
-        assert response.status_code == 404
-        assert "zone not found" in response.json()["detail"]
-
     def test_update_zone_id_mismatch(self, client):
         """Test updating zone with mismatched ID returns 400."""
         # Create zone
-        zone_data = {
-            "id": 1,
-            "borough": "Manhattan",
-            "zone_name": "Central Park",
-            "service_zone": "Yellow",
-            "active": True
-        }
-        client.post("/zones", json=zone_data)
+        client.post(URL_ZONES, content=ZONE_MANHATTAN_BODY, headers=JSON_HEADERS)
 
         # Try to update with different ID in body
-        updated_data = {
-            "id": 2,  # Different ID
-            "borough": "Manhattan",
-            "zone_name": "Updated Park",
-            "service_zone": "Yellow",
-            "active": False
-        }
+        updated_data = {**ZONE_MANHATTAN, "id": 2}
 
-        response = client.put("/zones/1", json=updated_data)
+        response = client.put(URL_ZONE_1, json=updated_data)
 
         assert response.status_code == 400
         assert "Zone ID mismatch" in response.json()["detail"]
@@ -260,50 +263,36 @@ class TestZonesEndpoints:
     def test_delete_zone_success(self, client):
         """Test deleting a zone successfully."""
         # Create zone
-        zone_data = {
-            "id": 1,
-            "borough": "Manhattan",
-            "zone_name": "Central Park",
-            "service_zone": "Yellow",
-            "active": True
-        }
-        client.post("/zones", json=zone_data)
+        client.post(URL_ZONES, content=ZONE_MANHATTAN_BODY, headers=JSON_HEADERS)
 
-        response = client.delete("/zones/1")
+        response = client.delete(URL_ZONE_1)
 
         assert response.status_code == 204
 
         # Verify zone is gone
-        response = client.get("/zones/1")
-        assert response.status_code == 404
+        assert get_global_storage().get_zone(1) is None
 
-    def test_delete_zone_not_exists(self, client):
-        """Test deleting a non-existing zone returns 404."""
-        response = client.delete("/zones/999")
+    def test_get_zone_unexpected_error_returns_500(self, client, monkeypatch):
+        """Test that an unhandled error becomes a generic 500 response."""
+        from app import routes_zones
 
-        assert response.status_code == 404
-        assert "zone not found" in response.json()["detail"]
+        def fail(zone_id):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(routes_zones.storage, "get_zone", fail)
+
+        response = TestClient(app, raise_server_exceptions=False).get("/zones/1")
+
+        assert response.status_code == 500
+        assert response.json() == {"detail": "internal server error"}
 
 
 class TestRoutesEndpoints:
     """Test suite for routes CRUD endpoints."""
 
-    def test_create_route_success(self, client):
+    def test_create_route_success(self, client, seeded_zones):
         """Test creating a route successfully."""
-        # First create zones
-        zone1 = {"id": 1, "borough": "A", "zone_name": "Z1", "service_zone": "S", "active": True}
-        zone2 = {"id": 2, "borough": "B", "zone_name": "Z2", "service_zone": "S", "active": True}
-        client.post("/zones", json=zone1)
-        client.post("/zones", json=zone2)
-
-        route_data = {
-            "pickup_zone_id": 1,
-            "dropoff_zone_id": 2,
-            "name": "Route 1 to 2",
-            "active": True
-        }
-
-        response = client.post("/routes", json=route_data)
+        response = client.post(URL_ROUTES, content=ROUTE_1_2_BODY, headers=JSON_HEADERS)
 
         assert response.status_code == 201
         response_data = response.json()
@@ -313,88 +302,94 @@ class TestRoutesEndpoints:
         assert response_data["active"] is True
         assert response_data["id"] == 1  # Should be assigned ID 1
 
-    def test_create_route_same_zone(self, client):
-        """Test creating route with same pickup/dropoff returns 422 (Pydantic validation)."""
-        # Create zone
-        zone = {"id": 1, "borough": "A", "zone_name": "Z1", "service_zone": "S", "active": True}
-        client.post("/zones", json=zone)
-
-        route_data = {
-            "pickup_zone_id": 1,
-            "dropoff_zone_id": 1,
-            "name": "Invalid Route",
-            "active": True
+    def test_create_routes_batch_success(self, client, seeded_zones):
+        """Test creating several routes in one request with consecutive IDs."""
+        batch = {
+            "routes": [
+                {"pickup_zone_id": 1, "dropoff_zone_id": 2, "name": "Route 1 to 2"},
+                {"pickup_zone_id": 2, "dropoff_zone_id": 1, "name": "Route 2 to 1"},
+            ]
+        }
+
+        response = client.post("/routes/batch", json=batch)
+
+        assert response.status_code == 201
+        assert [route["id"] for route in response.json()] == [1, 2]
+        assert response.json()[0]["created_at"]
+        assert len(client.get(URL_ROUTES).json()) == 2
+
+    def test_create_routes_batch_missing_zone(self, client, seeded_zones):
+        """Test that a batch referencing a missing zone returns 400 and creates nothing."""
+        batch = {
+            "routes": [
+                {"pickup_zone_id": 1, "dropoff_zone_id": 2, "name": "Route 1 to 2"},
+                {"pickup_zone_id": 1, "dropoff_zone_id": 99, "name": "Route 1 to 99"},
+            ]
         }
 
-        response = client.post("/routes", json=route_data)
+        response = client.post("/routes/batch", json=batch)
 
-        assert response.status_code == 422  # Pydantic validation error
+        assert response.status_code == 400
+        assert client.get(URL_ROUTES).json() == []
+
+    def test_create_route_same_zone(self):
+        """Test that a route with the same pickup/dropoff fails schema validation."""
+        with pytest.raises(ValidationError):
+            RouteCreate(
+                pickup_zone_id=1,
+                dropoff_zone_id=1,
+                name="Invalid Route",
+                active=True,
+            )
 
     def test_create_route_missing_zone(self, client):
         """Test creating route with non-existing zone returns 400."""
         # Create only one zone
-        zone = {"id": 1, "borough": "A", "zone_name": "Z1", "service_zone": "S", "active": True}
-        client.post("/zones", json=zone)
-
-        route_data = {
-            "pickup_zone_id": 1,
-            "dropoff_zone_id": 999,  # Doesn't exist
-            "name": "Invalid Route",
-            "active": True
-        }
+        client.post(URL_ZONES, content=ZONE_MANHATTAN_BODY, headers=JSON_HEADERS)
+
+        route_data = {**ROUTE_1_2, "dropoff_zone_id": 999}  # Zone 999 doesn't exist
 
-        response = client.post("/routes", json=route_data)
+        response = client.post(URL_ROUTES, json=route_data)
 
         assert response.status_code == 400
         assert "dropoff_zone_id not in zones" in response.json()["detail"]
 
     def test_list_routes_empty(self, client):
         """Test listing routes when empty."""
-        response = client.get("/routes")
+        response = client.get(URL_ROUTES)
 
         assert response.status_code == 200
         assert response.json() == []
 
-    def test_list_routes_with_data(self, client):
+    def test_list_routes_with_data(self, client, seeded_zones):
         """Test listing routes with data."""
-        # Create zones
-        zone1 = {"id": 1, "borough": "A", "zone_name": "Z1", "service_zone": "S", "active": True}
-        zone2 = {"id": 2, "borough": "B", "zone_name": "Z2", "service_zone": "S", "active": True}
-        client.post("/zones", json=zone1)
-        client.post("/zones", json=zone2)
-
-        # Create route
-        route_data = {
-            "pickup_zone_id": 1,
-            "dropoff_zone_id": 2,
-            "name": "Route 1 to 2",
-            "active": True
-        }
-        client.post("/routes", json=route_data)
+        client.post(URL_ROUTES, content=ROUTE_1_2_BODY, headers=JSON_HEADERS)
 
-        response = client.get("/routes")
+        response = client.get(URL_ROUTES)
 
         assert response.status_code == 200
         assert len(response.json()) == 1
         assert response.json()[0]["pickup_zone_id"] == 1
 
-    def test_get_route_exists(self, client):
+    def test_list_routes_not_modified(self, client, seeded_zones):
+        """Test that a filtered route list honours If-None-Match."""
+        client.post(URL_ROUTES, content=ROUTE_1_2_BODY, headers=JSON_HEADERS)
+        first = client.get(URL_ROUTES, params={"pickup_zone_id": 1})
+
+        response = client.get(
+            URL_ROUTES,
+            params={"pickup_zone_id": 1},
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == first.headers["etag"]
+
+    def test_get_route_exists(self, client, seeded_zones):
         """Test getting an existing route."""
-        # Create zones and route
-        zone1 = {"id": 1, "borough": "A", "zone_name": "Z1", "service_zone": "S", "active": True}
-        zone2 = {"id": 2, "borough": "B", "zone_name": "Z2", "service_zone": "S", "active": True}
-        client.post("/zones", json=zone1)
-        client.post("/zones", json=zone2)
-
-        route_data = {
-            "pickup_zone_id": 1,
-            "dropoff_zone_id": 2,
-            "name": "Route 1 to 2",
-            "active": True
-        }
-        client.post("/routes", json=route_data)
+        client.post(URL_ROUTES, content=ROUTE_1_2_BODY, headers=JSON_HEADERS)
 
-        response = client.get("/routes/1")
+        response = client.get(URL_ROUTE_1)
 
         assert response.status_code == 200
         assert response.json()["id"] == 1
@@ -406,60 +401,29 @@ class TestRoutesEndpoints:
         assert response.status_code == 404
         assert "route not found" in response.json()["detail"]
 
-    def test_update_route_success(self, client):
+    def test_update_route_success(self, client, seeded_zones):
         """Test updating a route successfully."""
-        # Create zones and route
-        zone1 = {"id": 1, "borough": "A", "zone_name": "Z1", "service_zone": "S", "active": True}
-        zone2 = {"id": 2, "borough": "B", "zone_name": "Z2", "service_zone": "S", "active": True}
-        client.post("/zones", json=zone1)
-        client.post("/zones", json=zone2)
-
-        route_data = {
-            "pickup_zone_id": 1,
-            "dropoff_zone_id": 2,
-            "name": "Original Route",
-            "active": True
-        }
-        client.post("/routes", json=route_data)
+        client.post(URL_ROUTES, content=ROUTE_1_2_BODY, headers=JSON_HEADERS)
 
         # Update route
-        updated_data = {
-            "id": 1,
-            "pickup_zone_id": 1,
-            "dropoff_zone_id": 2,
-            "name": "Updated Route",
-            "active": False
-        }
+        updated_data = {**ROUTE_1_2, "id": 1, "name": "Updated Route", "active": False}
 
-        response = client.put("/routes/1", json=updated_data)
+        response = client.put(URL_ROUTE_1, json=updated_data)
 
         assert response.status_code == 200
         assert response.json()["name"] == "Updated Route"
         assert response.json()["active"] is False
 
-    def test_delete_route_success(self, client):
+    def test_delete_route_success(self, client, seeded_zones):
         """Test deleting a route successfully."""
-        # Create zones and route
-        zone1 = {"id": 1, "borough": "A", "zone_name": "Z1", "service_zone": "S", "active": True}
-        zone2 = {"id": 2, "borough": "B", "zone_name": "Z2", "service_zone": "S", "active": True}
-        client.post("/zones", json=zone1)
-        client.post("/zones", json=zone2)
-
-        route_data = {
-            "pickup_zone_id": 1,
-            "dropoff_zone_id": 2,
-            "name": "Route to delete",
-            "active": True
-        }
-        client.post("/routes", json=route_data)
+        client.post(URL_ROUTES, content=ROUTE_1_2_BODY, headers=JSON_HEADERS)
 
-        response = client.delete("/routes/1")
+        response = client.delete(URL_ROUTE_1)
 
         assert response.status_code == 204
 
         # Verify route is gone
-        response = client.get("/routes/1")
-        assert response.status_code == 404
+        assert get_global_storage().get_route(1) is None
 
     def test_delete_route_not_exists(self, client):
         """Test deleting a non-existing route returns 404."""
@@ -468,46 +432,135 @@ class TestRoutesEndpoints:
         assert response.status_code == 404
         assert "route not found" in response.json()["detail"]
 
+    def test_delete_route_unexpected_error_returns_500(self, client, monkeypatch):
+        """Test that an unhandled error becomes a generic 500 response."""
+        from app import routes_routes
+
+        def fail(route_id):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(routes_routes.storage, "delete_route", fail)
+
+        response = TestClient(app, raise_server_exceptions=False).delete("/routes/1")
 
+        assert response.status_code == 500
+        assert response.json() == {"detail": "internal server error"}
+
+
+@pytest.mark.upload
 class TestUploadsEndpoints:
     """Test suite for upload endpoints."""
 
-    def test_upload_parquet_invalid_file_type(self, client):
-        """Test uploading non-parquet file returns 400."""
-        files = {"file": ("test.txt", b"not a parquet file", "text/plain")}
+    @pytest.mark.parametrize(
+        "files,data,expected_msg",
+        [
+            (
+                {"file": ("test.txt", b"not a parquet file", "text/plain")},
+                {"mode": "create", "limit_rows": "1000", "top_n_routes": "10"},
+                "File must be a .parquet file",
+            ),
+            (
+                {"file": ("test.parquet", b"fake parquet content", "application/octet-stream")},
+                {"mode": "invalid", "limit_rows": "1000", "top_n_routes": "10"},
+                "Invalid mode",
+            ),
+            (
+                {"file": ("test.parquet", b"fake parquet content", "application/octet-stream")},
+                {"mode": "create", "limit_rows": "0", "top_n_routes": "10"},
+                "limit_rows must be between 1 and 1,000,000",
+            ),
+            (
+                {"file": ("test.parquet", b"fake parquet content", "application/octet-stream")},
+                {"mode": "create", "limit_rows": "1000", "top_n_routes": "0"},
+                "top_n_routes must be between 1 and 500",
+            ),
+        ],
+        ids=["file_type", "mode", "limit_rows", "top_n_routes"],
+    )
+    def test_upload_parquet_invalid_request(self, client, files, data, expected_msg):
+        """Test that an invalid file or form field returns 400."""
+        response = client.post("/uploads/trips-parquet", files=files, data=data)
+
+        assert response.status_code == 400
+        assert expected_msg in response.json()["detail"]
+
+    def test_upload_parquet_success(self, client):
+        """Test uploading a valid parquet file returns a processing summary."""
+        buffer = io.BytesIO()
+        pd.DataFrame({
+            "PULocationID": [1, 1, 2, 3],
+            "DOLocationID": [2, 2, 3, 1],
+        }).to_parquet(buffer)
+        files = {"file": ("trips.parquet", buffer.getvalue(), "application/octet-stream")}
         data = {"mode": "create", "limit_rows": "1000", "top_n_routes": "10"}
 
         response = client.post("/uploads/trips-parquet", files=files, data=data)
 
-        assert response.status_code == 400
-        assert "File must be a .parquet file" in response.json()["detail"]
+        assert response.status_code == 200
+        body = response.json()
+        assert body["file_name"] == "trips.parquet"
+        assert body["rows_read"] == 4
+        assert body["routes_detected"] == 3
+
+    def test_upload_parquet_job_runs_in_background(self, client):
+        """Test that a queued upload returns 202 and can be polled to completion."""
+        buffer = io.BytesIO()
+        pd.DataFrame({
+            "PULocationID": [1, 1, 2],
+            "DOLocationID": [2, 2, 3],
+        }).to_parquet(buffer)
+        files = {"file": ("trips.parquet", buffer.getvalue(), "application/octet-stream")}
+        data = {"mode": "create", "limit_rows": "1000", "top_n_routes": "10"}
 
-    def test_upload_parquet_invalid_mode(self, client):
-        """Test uploading with invalid mode returns 400."""
-        files = {"file": ("test.parquet", b"fake parquet content", "application/octet-stream")}
-        data = {"mode": "invalid", "limit_rows": "1000", "top_n_routes": "10"}
+        response = client.post("/uploads/trips-parquet/jobs", files=files, data=data)
 
-        response = client.post("/uploads/trips-parquet", files=files, data=data)
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
 
-        assert response.status_code == 400
-        assert "Invalid mode" in response.json()["detail"]
+        response = client.get(f"/uploads/jobs/{job_id}")
 
-    def test_upload_parquet_invalid_limit_rows(self, client):
-        """Test uploading with invalid limit_rows returns 400."""
-        files = {"file": ("test.parquet", b"fake parquet content", "application/octet-stream")}
-        data = {"mode": "create", "limit_rows": "0", "top_n_routes": "10"}  # Invalid: must be > 0
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "done"
+        assert body["result"]["routes_created"] == 2
 
-        response = client.post("/uploads/trips-parquet", files=files, data=data)
+    def test_upload_parquet_job_failure_is_reported(self, client):
+        """Test that a job on an unreadable file ends as failed with an error."""
+        files = {"file": ("trips.parquet", b"not parquet", "application/octet-stream")}
+        data = {"mode": "create", "limit_rows": "1000", "top_n_routes": "10"}
 
-        assert response.status_code == 400
-        assert "limit_rows must be between 1 and 1,000,000" in response.json()["detail"]
+        job_id = client.post(
+            "/uploads/trips-parquet/jobs", files=files, data=data
+        ).json()["job_id"]
+        body = client.get(f"/uploads/jobs/{job_id}").json()
 
-    def test_upload_parquet_invalid_top_n_routes(self, client):
-        """Test uploading with invalid top_n_routes returns 400."""
-        files = {"file": ("test.parquet", b"fake parquet content", "application/octet-stream")}
-        data = {"mode": "create", "limit_rows": "1000", "top_n_routes": "0"}  # Invalid: must be > 0
+        assert body["status"] == "failed"
+        assert body["error"]
 
-        response = client.post("/uploads/trips-parquet", files=files, data=data)
+    def test_get_upload_job_not_found(self, client):
+        """Test polling an unknown job returns 404."""
+        response = client.get("/uploads/jobs/unknown")
 
-        assert response.status_code == 400
-        assert "top_n_routes must be between 1 and 500" in response.json()["detail"]
\ No newline at end of file
+        assert response.status_code == 404
+
+    def test_upload_job_limit_keeps_active_jobs(self, client, monkeypatch):
+        """Test that a full job table evicts only finished jobs, else answers 503."""
+        jobs = {
+            f"job{i}": UploadJob(job_id=f"job{i}", status="running")
+            for i in range(routes_uploads.MAX_UPLOAD_JOBS)
+        }
+        monkeypatch.setattr(routes_uploads, "upload_jobs", jobs)
+        files = {"file": ("trips.parquet", b"not parquet", "application/octet-stream")}
+        data = {"mode": "create", "limit_rows": "1000", "top_n_routes": "10"}
+
+        response = client.post("/uploads/trips-parquet/jobs", files=files, data=data)
+
+        assert response.status_code == 503
+        assert client.get("/uploads/jobs/job0").json()["status"] == "running"
+
+        jobs["job5"].status = "done"
+        response = client.post("/uploads/trips-parquet/jobs", files=files, data=data)
+
+        assert response.status_code == 202
+        assert "job5" not in jobs
+        assert client.get("/uploads/jobs/job0").status_code == 200
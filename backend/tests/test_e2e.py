@@ -5,127 +5,128 @@ This module contains comprehensive end-to-end tests that simulate real user work
 and verify the complete integration between all backend components.
 """
 
+import asyncio
+
+import httpx
 import pytest
-import io
-import pandas as pd
-from fastapi.testclient import TestClient
 from app.main import app
-from app.schemas import ZoneBase, RouteBase
+from app.schemas import ZoneBase
+from app.storage import get_global_storage
+
+
+@pytest.fixture(autouse=True)
+def reset_storage():
+    """Clear storage before each test."""
+    get_global_storage().clear_all()
+
+
+ZONES_DATA = [
+    {
+        "id": 1,
+        "borough": "Manhattan",
+        "zone_name": "Central Park",
+        "service_zone": "Yellow",
+        "active": True
+    },
+    {
+        "id": 2,
+        "borough": "Brooklyn",
+        "zone_name": "Williamsburg",
+        "service_zone": "Green",
+        "active": True
+    },
+    {
+        "id": 3,
+        "borough": "Queens",
+        "zone_name": "JFK Airport",
+        "service_zone": "Yellow",
+        "active": False
+    }
+]
+
+# Three connected zones and the routes between them
+NETWORK_ZONES = [
+    {"id": 1, "borough": "Manhattan", "zone_name": "Midtown", "service_zone": "Yellow", "active": True},
+    {"id": 2, "borough": "Manhattan", "zone_name": "Downtown", "service_zone": "Yellow", "active": True},
+    {"id": 3, "borough": "Brooklyn", "zone_name": "DUMBO", "service_zone": "Green", "active": True},
+]
+NETWORK_ROUTES = [
+    {"pickup_zone_id": 1, "dropoff_zone_id": 2, "name": "Midtown to Downtown", "active": True},
+    {"pickup_zone_id": 2, "dropoff_zone_id": 3, "name": "Downtown to DUMBO", "active": True},
+    {"pickup_zone_id": 1, "dropoff_zone_id": 3, "name": "Midtown to DUMBO", "active": True},
+]
 
 
 @pytest.fixture
-def client():
-    """Create test client for FastAPI app with fresh storage."""
-    from app.storage import get_global_storage
-    # Clear storage before each test
-    storage = get_global_storage()
-    storage.clear_all()
-    return TestClient(app)
+def seeded_zones():
+    """Store NETWORK_ZONES directly, without going through the API."""
+    get_global_storage().create_zones([ZoneBase(**zone) for zone in NETWORK_ZONES])
 
 
 class TestEndToEndWorkflow:
     """End-to-end tests simulating complete user workflows."""
 
-    def test_complete_zone_management_workflow(self, client):
-        """Test complete zone management workflow: create, read, update, delete."""
-        # Step 1: Create multiple zones
-        zones_data = [
-            {
-                "id": 1,
-                "borough": "Manhattan",
-                "zone_name": "Central Park",
-                "service_zone": "Yellow",
-                "active": True
-            },
-            {
-                "id": 2,
-                "borough": "Brooklyn",
-                "zone_name": "Williamsburg",
-                "service_zone": "Green",
-                "active": True
-            },
-            {
-                "id": 3,
-                "borough": "Queens",
-                "zone_name": "JFK Airport",
-                "service_zone": "Yellow",
-                "active": False
-            }
-        ]
+    @pytest.mark.parametrize("zone", ZONES_DATA, ids=lambda zone: zone["zone_name"])
+    def test_create_zone(self, client, zone):
+        """Test that each zone is created and can be read back."""
+        response = client.post("/zones", json=zone)
+        assert response.status_code == 201
 
-        # Create all zones
-        for zone_data in zones_data:
-            response = client.post("/zones", json=zone_data)
-            assert response.status_code == 201
+        response = client.get(f"/zones/{zone['id']}")
+        assert response.status_code == 200
+        assert response.json()["zone_name"] == zone["zone_name"]
+
+    def test_list_and_filter_zones(self, client):
+        """Test listing zones and filtering them by active status and borough."""
+        for zone_data in ZONES_DATA:
+            client.post("/zones", json=zone_data)
 
-        # Step 2: List all zones
+        # List all zones
         response = client.get("/zones")
         assert response.status_code == 200
-        zones = response.json()
-        assert len(zones) == 3
+        assert len(response.json()) == 3
 
-        # Step 3: Filter active zones
+        # Filter active zones
         response = client.get("/zones?active=true")
         assert response.status_code == 200
-        active_zones = response.json()
-        assert len(active_zones) == 2
+        assert len(response.json()) == 2
 
-        # Step 4: Filter by borough
+        # Filter by borough
         response = client.get("/zones?borough=Manhattan")
         assert response.status_code == 200
         manhattan_zones = response.json()
         assert len(manhattan_zones) == 1
         assert manhattan_zones[0]["borough"] == "Manhattan"
 
-        # Step 5: Get specific zone
-        response = client.get("/zones/1")
-        assert response.status_code == 200
-        zone = response.json()
-        assert zone["id"] == 1
-        assert zone["zone_name"] == "Central Park"
+    def test_update_zone(self, client):
+        """Test updating a zone and reading the update back."""
+        client.post("/zones", json=ZONES_DATA[0])
 
-        # Step 6: Update zone
-        update_data = {
-            "id": 1,
-            "borough": "Manhattan",
-            "zone_name": "Central Park North",
-            "service_zone": "Yellow",
-            "active": True
-        }
+        update_data = {**ZONES_DATA[0], "zone_name": "Central Park North"}
         response = client.put("/zones/1", json=update_data)
         assert response.status_code == 200
 
         # Verify update
-        response = client.get("/zones/1")
-        assert response.status_code == 200
-        updated_zone = response.json()
-        assert updated_zone["zone_name"] == "Central Park North"
+        assert get_global_storage().get_zone(1).zone_name == "Central Park North"
+
+    def test_delete_zone(self, client):
+        """Test deleting one zone leaves the others in place."""
+        for zone_data in ZONES_DATA:
+            client.post("/zones", json=zone_data)
 
-        # Step 7: Delete zone
         response = client.delete("/zones/3")
         assert response.status_code == 204
 
         # Verify deletion
-        response = client.get("/zones/3")
-        assert response.status_code == 404
+        storage = get_global_storage()
+        assert not storage.zone_exists(3)
 
         # Verify remaining zones
-        response = client.get("/zones")
-        assert response.status_code == 200
-        remaining_zones = response.json()
-        assert len(remaining_zones) == 2
+        assert len(storage.get_all_zones()) == 2
 
-    def test_complete_route_management_workflow(self, client):
+    def test_complete_route_management_workflow(self, client, seeded_zones):
         """Test complete route management workflow."""
-        # Step 1: Create zones first
-        zone1 = {"id": 1, "borough": "A", "zone_name": "Z1", "service_zone": "S", "active": True}
-        zone2 = {"id": 2, "borough": "B", "zone_name": "Z2", "service_zone": "S", "active": True}
-        zone3 = {"id": 3, "borough": "C", "zone_name": "Z3", "service_zone": "S", "active": True}
-
-        for zone in [zone1, zone2, zone3]:
-            client.post("/zones", json=zone)
-
-        # Step 2: Create routes
+        # Step 1: Create routes
         routes_data = [
             {
                 "pickup_zone_id": 1,
@@ -153,20 +154,20 @@ class TestEndToEndWorkflow:
             assert response.status_code == 201
             created_routes.append(response.json())
 
-        # Step 3: List all routes
+        # Step 2: List all routes
         response = client.get("/routes")
         assert response.status_code == 200
         routes = response.json()
         assert len(routes) == 3
 
-        # Step 4: Get specific route
+        # Step 3: Get specific route
         route_id = created_routes[0]["id"]
         response = client.get(f"/routes/{route_id}")
         assert response.status_code == 200
         route = response.json()
         assert route["name"] == "Route A to B"
 
-        # Step 5: Update route
+        # Step 4: Update route
         update_data = {
             "id": route_id,
             "pickup_zone_id": 1,
@@ -178,61 +179,35 @@ class TestEndToEndWorkflow:
         assert response.status_code == 200
 
         # Verify update
-        response = client.get(f"/routes/{route_id}")
-        assert response.status_code == 200
-        updated_route = response.json()
-        assert updated_route["name"] == "Updated Route A to B"
+        assert get_global_storage().get_route(route_id).name == "Updated Route A to B"
 
-        # Step 6: Delete route
+        # Step 5: Delete route
         response = client.delete(f"/routes/{route_id}")
         assert response.status_code == 204
 
         # Verify remaining routes
-        response = client.get("/routes")
-        assert response.status_code == 200
-        remaining_routes = response.json()
-        assert len(remaining_routes) == 2
+        assert len(get_global_storage().get_all_routes()) == 2
 
-    def test_zone_route_integration_workflow(self, client):
-        """Test the integration between zones and routes."""
-        # Create zones
-        zones = [
-            {"id": 1, "borough": "Manhattan", "zone_name": "Midtown", "service_zone": "Yellow", "active": True},
-            {"id": 2, "borough": "Manhattan", "zone_name": "Downtown", "service_zone": "Yellow", "active": True},
-            {"id": 3, "borough": "Brooklyn", "zone_name": "DUMBO", "service_zone": "Green", "active": True},
-        ]
+    @pytest.mark.parametrize("route", NETWORK_ROUTES, ids=lambda route: route["name"])
+    def test_route_references_existing_zones(self, client, seeded_zones, route):
+        """Test that a route between existing zones is created and both zones resolve."""
+        response = client.post("/routes", json=route)
+        assert response.status_code == 201
+        created = response.json()
 
-        for zone in zones:
-            response = client.post("/zones", json=zone)
-            assert response.status_code == 201
+        # Verify pickup and dropoff zones exist
+        storage = get_global_storage()
+        assert storage.zone_exists(created["pickup_zone_id"])
+        assert storage.zone_exists(created["dropoff_zone_id"])
 
-        # Create routes between zones
-        routes = [
-            {"pickup_zone_id": 1, "dropoff_zone_id": 2, "name": "Midtown to Downtown", "active": True},
-            {"pickup_zone_id": 2, "dropoff_zone_id": 3, "name": "Downtown to DUMBO", "active": True},
-            {"pickup_zone_id": 1, "dropoff_zone_id": 3, "name": "Midtown to DUMBO", "active": True},
-        ]
+    def test_delete_zone_referenced_by_routes(self, client, seeded_zones):
+        """Test deleting a zone that routes still reference."""
+        for route in NETWORK_ROUTES:
+            client.post("/routes", json=route)
 
-        created_route_ids = []
-        for route in routes:
-            response = client.post("/routes", json=route)
-            assert response.status_code == 201
-            created_route_ids.append(response.json()["id"])
-
-        # Verify all routes exist and reference valid zones
         response = client.get("/routes")
         assert response.status_code == 200
-        all_routes = response.json()
-        assert len(all_routes) == 3
-
-        for route in all_routes:
-            # Verify pickup zone exists
-            pickup_response = client.get(f"/zones/{route['pickup_zone_id']}")
-            assert pickup_response.status_code == 200
-
-            # Verify dropoff zone exists
-            dropoff_response = client.get(f"/zones/{route['dropoff_zone_id']}")
-            assert dropoff_response.status_code == 200
+        assert len(response.json()) == 3
 
         # Test cascading - what happens when we delete a zone that's referenced by routes
         # This should fail because routes depend on zones
@@ -325,10 +300,7 @@ class TestEndToEndWorkflow:
         assert response.status_code == 422  # Should fail because pickup == dropoff (Pydantic validation)
 
         # Verify data integrity
-        response = client.get("/zones/1")
-        assert response.status_code == 200
-        zone = response.json()
-        assert zone["id"] == 1
+        assert get_global_storage().zone_exists(1)
 
         response = client.get("/routes")
         assert response.status_code == 200
@@ -339,68 +311,108 @@ class TestEndToEndWorkflow:
         # (This would require joining zone data with routes in a real implementation)
 
 
+@pytest.fixture
+def anyio_backend():
+    """Run async tests on asyncio only; the concurrency below uses asyncio.gather."""
+    return "asyncio"
+
+
+@pytest.fixture
+async def async_client():
+    """Async client calling the app in-process, for tests that send requests concurrently."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
 class TestPerformanceIntegration:
     """Performance-focused integration tests."""
 
-    def test_bulk_operations_performance(self, client):
-        """Test performance with bulk operations."""
-        # Create multiple zones
-        zones = []
-        for i in range(1, 11):  # Create 10 zones
-            zone_data = {
+    @pytest.mark.anyio
+    async def test_bulk_operations_performance(self, async_client):
+        """Test performance with bulk operations sent concurrently."""
+        zones = [
+            {
                 "id": i,
                 "borough": f"Borough{i}",
                 "zone_name": f"Zone{i}",
                 "service_zone": "Yellow",
                 "active": True
             }
-            zones.append(zone_data)
-            response = client.post("/zones", json=zone_data)
-            assert response.status_code == 201
+            for i in range(1, 11)  # Create 10 zones
+        ]
+        routes = [
+            {
+                "pickup_zone_id": i,
+                "dropoff_zone_id": j,
+                "name": f"Route {i} to {j}",
+                "active": True
+            }
+            for i in range(1, 6)  # Create routes between zones
+            for j in range(i + 1, min(i + 4, 11))
+        ]
 
-        # Create multiple routes
-        routes_created = 0
-        for i in range(1, 6):  # Create routes between zones
-            for j in range(i + 1, min(i + 4, 11)):
-                route_data = {
-                    "pickup_zone_id": i,
-                    "dropoff_zone_id": j,
-                    "name": f"Route {i} to {j}",
-                    "active": True
-                }
-                response = client.post("/routes", json=route_data)
-                assert response.status_code == 201
-                routes_created += 1
-
-        # Verify bulk retrieval
-        response = client.get("/zones")
-        assert response.status_code == 200
-        assert len(response.json()) == 10
+        responses = await asyncio.gather(
+            *(async_client.post("/zones", json=zone) for zone in zones)
+        )
+        assert all(response.status_code == 201 for response in responses)
+
+        responses = await asyncio.gather(
+            *(async_client.post("/routes", json=route) for route in routes)
+        )
+        assert all(response.status_code == 201 for response in responses)
+
+        # Verify the stored counts and that concurrent creates got distinct ids
+        storage = get_global_storage()
+        assert storage.get_storage_stats() == {"zones_count": 10, "routes_count": len(routes)}
+        assert sorted(route.id for route in storage.get_all_routes()) == list(
+            range(1, len(routes) + 1)
+        )
+
+    def test_bulk_operations_batch(self, client):
+        """Test creating the bulk data set with one batch request per resource."""
+        zones = [
+            {"id": i, "borough": f"Borough{i}", "zone_name": f"Zone{i}", "service_zone": "Yellow"}
+            for i in range(1, 11)
+        ]
+        routes = [
+            {"pickup_zone_id": i, "dropoff_zone_id": j, "name": f"Route {i} to {j}"}
+            for i in range(1, 6)
+            for j in range(i + 1, min(i + 4, 11))
+        ]
 
-        response = client.get("/routes")
-        assert response.status_code == 200
-        assert len(response.json()) == routes_created
+        response = client.post("/zones/batch", json={"zones": zones})
+        assert response.status_code == 201
 
-    def test_concurrent_access_simulation(self, client):
+        # Zone existence is checked once for the whole batch, inside one lock
+        response = client.post("/routes/batch", json={"routes": routes})
+        assert response.status_code == 201
+        assert [route["id"] for route in response.json()] == list(range(1, len(routes) + 1))
+
+        assert len(get_global_storage().get_all_routes()) == len(routes)
+
+    @pytest.mark.anyio
+    async def test_concurrent_access_simulation(self, async_client):
         """Simulate concurrent access patterns."""
         # Create initial data
         zone_data = {"id": 1, "borough": "Test", "zone_name": "Test", "service_zone": "Test", "active": True}
-        client.post("/zones", json=zone_data)
+        await async_client.post("/zones", json=zone_data)
 
         # Create a second zone for the route
         zone_data2 = {"id": 2, "borough": "Test2", "zone_name": "Test2", "service_zone": "Test", "active": True}
-        client.post("/zones", json=zone_data2)
+        await async_client.post("/zones", json=zone_data2)
 
-        # Simulate multiple read operations (concurrent reads should be fine)
-        for _ in range(5):
-            response = client.get("/zones/1")
-            assert response.status_code == 200
+        # Concurrent reads should be fine
+        responses = await asyncio.gather(
+            *(async_client.get("/zones/1") for _ in range(5))
+        )
+        assert all(response.status_code == 200 for response in responses)
 
         # Simulate read after write
         route_data = {"pickup_zone_id": 1, "dropoff_zone_id": 2, "name": "Test", "active": True}
-        client.post("/routes", json=route_data)
+        await async_client.post("/routes", json=route_data)
 
-        response = client.get("/routes")
+        response = await async_client.get("/routes")
         assert response.status_code == 200
         assert len(response.json()) == 1
 
@@ -408,19 +420,8 @@ class TestPerformanceIntegration:
 class TestUploadIntegration:
     """Integration tests for upload functionality."""
 
-    def test_upload_workflow_simulation(self, client):
+    def test_upload_workflow_simulation(self, client, seeded_zones):
         """Simulate the upload workflow (without actual file upload)."""
-        # Create zones that would be needed for upload processing
-        zones = [
-            {"id": 1, "borough": "Manhattan", "zone_name": "Midtown", "service_zone": "Yellow", "active": True},
-            {"id": 2, "borough": "Manhattan", "zone_name": "Downtown", "service_zone": "Yellow", "active": True},
-            {"id": 3, "borough": "Brooklyn", "zone_name": "DUMBO", "service_zone": "Green", "active": True},
-        ]
-
-        for zone in zones:
-            response = client.post("/zones", json=zone)
-            assert response.status_code == 201
-
         # Test that zones are ready for upload processing
         response = client.get("/zones")
         assert response.status_code == 200
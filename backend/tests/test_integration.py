@@ -0,0 +1,260 @@
+"""
+Tests for integration.py module.
+
+Tests the parquet processing pipeline of IntegrationService.
+"""
+
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import pandas as pd
+import pyarrow as pa
+from app.storage import Storage
+from app.schemas import ZoneBase
+from app.integration import IntegrationService
+
+
+def write_parquet(path, data):
+    """Write a dict of columns to a parquet file and return its path."""
+    pd.DataFrame(data).to_parquet(path)
+    return str(path)
+
+
+class TestProcessParquetUpload:
+    """Test suite for IntegrationService.process_parquet_upload."""
+
+    def setup_method(self):
+        """Set up fresh storage and service for each test."""
+        self.storage = Storage()
+        self.service = IntegrationService(self.storage)
+
+    def test_process_parquet_upload_ignores_extra_columns(self, tmp_path):
+        """Test that only the pickup/dropoff columns are needed."""
+        file_path = write_parquet(
+            tmp_path / "trips.parquet",
+            {
+                'PULocationID': [1, 1, 2],
+                'DOLocationID': [2, 2, 3],
+                'fare_amount': [10.0, 12.5, 7.0],
+            },
+        )
+
+        result = self.service.process_parquet_upload(
+            file_path, "trips.parquet", "create"
+        )
+
+        assert result.rows_read == 3
+        assert result.routes_detected == 2
+
+    def test_process_parquet_upload_limit_rows(self, tmp_path):
+        """Test that reading stops once limit_rows rows are collected."""
+        file_path = write_parquet(
+            tmp_path / "trips.parquet",
+            {'PULocationID': [1] * 100, 'DOLocationID': [2] * 100},
+        )
+
+        result = self.service.process_parquet_upload(
+            file_path, "trips.parquet", "create", limit_rows=10
+        )
+
+        assert result.rows_read == 10
+
+    def test_process_parquet_upload_file_object(self):
+        """Test that a readable file object can be processed without a path."""
+        buffer = io.BytesIO()
+        pd.DataFrame({'PULocationID': [1, 2], 'DOLocationID': [2, 3]}).to_parquet(buffer)
+        buffer.seek(0)
+
+        result = self.service.process_parquet_upload(buffer, "trips.parquet", "create")
+
+        assert result.rows_read == 2
+        assert result.routes_detected == 2
+
+    def test_process_parquet_upload_zones_created_and_activated(self, tmp_path):
+        """Test that missing zones are created and inactive ones reactivated."""
+        self.storage.create_zone(ZoneBase(
+            id=1, borough="Manhattan", zone_name="Midtown",
+            service_zone="Yellow Zone", active=False,
+        ))
+        file_path = write_parquet(
+            tmp_path / "trips.parquet",
+            {'PULocationID': [1, 1, 2], 'DOLocationID': [2, 2, 1]},
+        )
+
+        result = self.service.process_parquet_upload(
+            file_path, "trips.parquet", "update"
+        )
+
+        assert result.zones_created == 1
+        assert result.zones_updated == 1
+        assert self.storage.get_zone(1).active is True
+        assert self.storage.get_zone(2).zone_name == "Zone 2"
+
+    def test_read_trip_rows_downcasts_to_int16(self, tmp_path):
+        """Test that zone ID columns are downcast to int16 when they fit."""
+        file_path = write_parquet(
+            tmp_path / "trips.parquet",
+            {'PULocationID': [1, 265], 'DOLocationID': [264, 2]},
+        )
+
+        table = self.service._read_trip_rows(file_path, limit_rows=10)
+
+        assert table.schema.types == [pa.int16(), pa.int16()]
+
+    def test_read_trip_rows_keeps_wide_ids(self, tmp_path):
+        """Test that zone IDs beyond int16 keep their original type."""
+        file_path = write_parquet(
+            tmp_path / "trips.parquet",
+            {'PULocationID': [1, 70000], 'DOLocationID': [2, 3]},
+        )
+
+        table = self.service._read_trip_rows(file_path, limit_rows=10)
+
+        assert table['PULocationID'].to_pylist() == [1, 70000]
+
+    def test_read_trip_rows_keeps_wide_ids_in_later_batch(self, tmp_path):
+        """Test that a wide ID after narrowed batches widens the whole table."""
+        file_path = str(tmp_path / "trips.parquet")
+        pd.DataFrame({
+            'PULocationID': [1, 2, 3, 70000],
+            'DOLocationID': [2, 3, 4, 5],
+        }).to_parquet(file_path, row_group_size=2)
+
+        table = self.service._read_trip_rows(file_path, limit_rows=10)
+
+        assert table.schema.field('PULocationID').type == pa.int64()
+        assert table['PULocationID'].to_pylist() == [1, 2, 3, 70000]
+
+    def test_process_parquet_upload_reports_invalid_pairs(self, tmp_path):
+        """Test that same-zone pairs are reported as errors and skipped."""
+        file_path = write_parquet(
+            tmp_path / "trips.parquet",
+            {'PULocationID': [5, 5, 1], 'DOLocationID': [5, 5, 2]},
+        )
+
+        result = self.service.process_parquet_upload(
+            file_path, "trips.parquet", "create"
+        )
+
+        assert result.errors[0] == "Invalid route pair: pickup=5, dropoff=5"
+        assert not self.storage.zone_exists(5)
+
+    def test_process_parquet_upload_skips_null_ids(self, tmp_path):
+        """Test that trips with null zone IDs yield no route and no error."""
+        file_path = write_parquet(
+            tmp_path / "trips.parquet",
+            {
+                'PULocationID': pd.array([None, None, None, 1, 1, 2], dtype="Int64"),
+                'DOLocationID': pd.array([None, None, None, 2, 2, 3], dtype="Int64"),
+            },
+        )
+
+        result = self.service.process_parquet_upload(
+            file_path, "trips.parquet", "create"
+        )
+
+        assert result.routes_detected == 2
+        assert result.errors == []
+        assert not self.storage.zone_exists(0)
+
+    def test_process_parquet_upload_creates_routes(self, tmp_path):
+        """Test that detected routes are created with consecutive IDs."""
+        file_path = write_parquet(
+            tmp_path / "trips.parquet",
+            {'PULocationID': [1, 1, 2], 'DOLocationID': [2, 2, 3]},
+        )
+
+        result = self.service.process_parquet_upload(
+            file_path, "trips.parquet", "create"
+        )
+
+        assert result.routes_created == 2
+        assert result.errors == []
+        assert [route.id for route in self.storage.get_all_routes()] == [1, 2]
+        assert self.storage.find_route_by_zones(1, 2).name == "Route 1→2 (freq:2)"
+
+    def test_process_parquet_upload_is_idempotent(self, tmp_path):
+        """Test that uploading the same file twice creates routes only once."""
+        file_path = write_parquet(
+            tmp_path / "trips.parquet",
+            {'PULocationID': [1, 1, 2], 'DOLocationID': [2, 2, 3]},
+        )
+
+        self.service.process_parquet_upload(file_path, "trips.parquet", "create")
+        result = self.service.process_parquet_upload(
+            file_path, "trips.parquet", "create"
+        )
+
+        assert result.routes_created == 0
+        assert self.storage.get_storage_stats()["routes_count"] == 2
+
+    def test_process_parquet_upload_update_mode(self, tmp_path):
+        """Test that update mode refreshes existing routes and creates new ones."""
+        first = write_parquet(
+            tmp_path / "first.parquet", {'PULocationID': [1], 'DOLocationID': [2]}
+        )
+        second = write_parquet(
+            tmp_path / "second.parquet",
+            {'PULocationID': [1, 1, 2], 'DOLocationID': [2, 2, 3]},
+        )
+        self.service.process_parquet_upload(first, "first.parquet", "create")
+
+        result = self.service.process_parquet_upload(
+            second, "second.parquet", "update"
+        )
+
+        assert result.routes_updated == 1
+        assert result.routes_created == 1
+        assert self.storage.find_route_by_zones(2, 3).id == 2
+
+    def test_process_parquet_upload_concurrent_same_file(self, tmp_path):
+        """Test that two uploads of one file at once create each zone and route once."""
+        file_path = write_parquet(
+            tmp_path / "trips.parquet",
+            {'PULocationID': [1, 1, 2], 'DOLocationID': [2, 2, 3]},
+        )
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(
+                lambda _: self.service.process_parquet_upload(
+                    file_path, "trips.parquet", "create"
+                ),
+                range(2),
+            ))
+
+        assert sorted(r.zones_created for r in results) == [0, 3]
+        assert sorted(r.routes_created for r in results) == [0, 2]
+        assert all(r.errors == [] for r in results)
+        assert self.storage.get_storage_stats() == {"zones_count": 3, "routes_count": 2}
+
+    def test_read_trip_rows_stops_at_row_group_boundary(self, tmp_path):
+        """Test that limit_rows spanning row groups reads exactly limit_rows."""
+        file_path = str(tmp_path / "trips.parquet")
+        pd.DataFrame({
+            'PULocationID': list(range(1, 101)),
+            'DOLocationID': list(range(2, 102)),
+        }).to_parquet(file_path, row_group_size=30)
+
+        table = self.service._read_trip_rows(file_path, limit_rows=45)
+
+        assert table.num_rows == 45
+        assert table['PULocationID'].to_pylist() == list(range(1, 46))
+
+    def test_process_parquet_upload_missing_columns(self, tmp_path):
+        """Test that a parquet file without required columns raises ValueError."""
+        file_path = write_parquet(
+            tmp_path / "trips.parquet", {'PULocationID': [1, 2, 3]}
+        )
+
+        with pytest.raises(ValueError, match="must contain 'PULocationID' and 'DOLocationID'"):
+            self.service.process_parquet_upload(file_path, "trips.parquet", "create")
+
+    def test_process_parquet_upload_invalid_mode(self, tmp_path):
+        """Test that an invalid mode raises ValueError."""
+        file_path = write_parquet(
+            tmp_path / "trips.parquet", {'PULocationID': [1], 'DOLocationID': [2]}
+        )
+
+        with pytest.raises(ValueError, match="Invalid mode"):
+            self.service.process_parquet_upload(file_path, "trips.parquet", "merge")
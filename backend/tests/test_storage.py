@@ -4,17 +4,50 @@ Tests for storage.py module.
 Tests the in-memory storage functionality for zones and routes.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
 import pytest
+from pydantic import ValidationError
 from app.storage import Storage
 from app.schemas import ZoneBase, RouteBase
 
 
+# Built once; the models are frozen, so every test can store the same instances
+ZONE_1 = ZoneBase(id=1, borough="A", zone_name="Z1", service_zone="S", active=True)
+ZONE_2 = ZoneBase(id=2, borough="B", zone_name="Z2", service_zone="S", active=True)
+ZONE_3 = ZoneBase(id=3, borough="C", zone_name="Z3", service_zone="S", active=True)
+ROUTE_1_2 = RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=2, name="Route 1-2", active=True)
+ROUTE_2_3 = RouteBase(id=2, pickup_zone_id=2, dropoff_zone_id=3, name="Route 2-3", active=True)
+
+
+@pytest.fixture(scope="module")
+def populated_storage():
+    """Storage holding ZONE_1-3 and two routes, built once for read-only tests."""
+    storage = Storage()
+    storage.create_zones([ZONE_1, ZONE_2, ZONE_3])
+    storage.create_routes([ROUTE_1_2, ROUTE_2_3])
+    return storage
+
+
 class TestStorage:
     """Test suite for Storage class."""
 
+    @classmethod
+    def setup_class(cls):
+        """Create one storage instance shared by the class's tests."""
+        cls.storage = Storage()
+
     def setup_method(self):
-        """Set up fresh storage instance for each test."""
-        self.storage = Storage()
+        """Reset the shared storage before each test."""
+        self.storage.clear_all()
+
+    @pytest.fixture
+    def stored_route(self):
+        """Store ZONE_1, ZONE_2 and ROUTE_1_2, and return the route."""
+        self.storage.create_zones([ZONE_1, ZONE_2])
+        self.storage.create_route(ROUTE_1_2)
+        return ROUTE_1_2
 
     def test_initial_state(self):
         """Test storage starts empty."""
@@ -37,9 +70,17 @@ class TestStorage:
         assert 1 in self.storage._zones_db
         assert self.storage._zones_db[1] == zone
 
+    def test_create_zone_timestamp_is_taken_at_creation(self):
+        """Test that created_at is taken when each zone is built, in UTC."""
+        before = datetime.now(timezone.utc)
+        zone = ZoneBase(id=1, borough="A", zone_name="Z1", service_zone="S")
+
+        assert zone.created_at.tzinfo is timezone.utc
+        assert zone.created_at >= before
+
     def test_create_zone_duplicate_id(self):
         """Test creating zone with duplicate ID raises ValueError."""
-        zone1 = ZoneBase(id=1, borough="A", zone_name="Z1", service_zone="S", active=True)
+        zone1 = ZONE_1
         zone2 = ZoneBase(id=1, borough="B", zone_name="Z2", service_zone="S", active=True)
 
         self.storage.create_zone(zone1)
@@ -47,9 +88,34 @@ class TestStorage:
         with pytest.raises(ValueError, match="Value already exists"):
             self.storage.create_zone(zone2)
 
+    def test_create_zones_success(self):
+        """Test creating several zones at once."""
+        zones = [
+            ZONE_1,
+            ZONE_2,
+        ]
+
+        self.storage.create_zones(zones)
+
+        assert self.storage.get_zone(1) == zones[0]
+        assert self.storage.get_zone(2) == zones[1]
+
+    def test_create_zones_duplicate_id_creates_nothing(self):
+        """Test that a duplicate ID in a batch raises and stores no zones."""
+        self.storage.create_zone(ZONE_1)
+        zones = [
+            ZONE_2,
+            ZoneBase(id=1, borough="C", zone_name="Z3", service_zone="S", active=True),
+        ]
+
+        with pytest.raises(ValueError, match="Value already exists"):
+            self.storage.create_zones(zones)
+
+        assert not self.storage.zone_exists(2)
+
     def test_get_zone_exists(self):
         """Test getting an existing zone."""
-        zone = ZoneBase(id=1, borough="A", zone_name="Z", service_zone="S", active=True)
+        zone = ZONE_1
         self.storage.create_zone(zone)
 
         result = self.storage.get_zone(1)
@@ -67,19 +133,17 @@ class TestStorage:
 
     def test_get_all_zones_with_data(self):
         """Test getting all zones with data."""
-        zone1 = ZoneBase(id=1, borough="A", zone_name="Z1", service_zone="S", active=True)
+        zone1 = ZONE_1
         zone2 = ZoneBase(id=2, borough="B", zone_name="Z2", service_zone="S", active=False)
         self.storage.create_zone(zone1)
         self.storage.create_zone(zone2)
 
         result = self.storage.get_all_zones()
-        assert len(result) == 2
-        assert zone1 in result
-        assert zone2 in result
+        assert {zone.id for zone in result} == {1, 2}
 
     def test_get_all_zones_filter_active(self):
         """Test filtering zones by active status."""
-        zone1 = ZoneBase(id=1, borough="A", zone_name="Z1", service_zone="S", active=True)
+        zone1 = ZONE_1
         zone2 = ZoneBase(id=2, borough="B", zone_name="Z2", service_zone="S", active=False)
         self.storage.create_zone(zone1)
         self.storage.create_zone(zone2)
@@ -99,9 +163,89 @@ class TestStorage:
         assert len(result) == 1
         assert result[0] == zone1
 
+    def test_get_all_zones_filter_combined_keeps_creation_order(self):
+        """Test combined filters return zones in creation order."""
+        for zone_id in (3, 1, 2):
+            self.storage.create_zone(ZoneBase(
+                id=zone_id, borough="Manhattan", zone_name=f"Z{zone_id}",
+                service_zone="S", active=zone_id != 1,
+            ))
+
+        result = self.storage.get_all_zones(active=True, borough="Manhattan")
+        assert [zone.id for zone in result] == [3, 2]
+
+        result = self.storage.get_all_zones(active=False)
+        assert [zone.id for zone in result] == [1]
+
+    def test_get_all_zones_filters_follow_updates(self):
+        """Test borough/active filters reflect updated and deleted zones."""
+        zone = ZONE_1
+        self.storage.create_zone(zone)
+        self.storage.update_zone(
+            ZoneBase(id=1, borough="B", zone_name="Z", service_zone="S", active=False)
+        )
+
+        assert self.storage.get_all_zones(borough="A") == []
+        assert self.storage.get_all_zones(active=True) == []
+        assert [z.id for z in self.storage.get_all_zones(borough="B", active=False)] == [1]
+
+        self.storage.delete_zone(1)
+        assert self.storage.get_all_zones(borough="B") == []
+
+    def test_zone_indexes_drop_emptied_borough(self):
+        """Test that moving the last zone out of a borough removes its index entry."""
+        self.storage.create_zone(ZONE_1)
+
+        self.storage.update_zone(
+            ZoneBase(id=1, borough="B", zone_name="Z1", service_zone="S", active=True)
+        )
+
+        assert set(self.storage._zones_by_borough) == {"B"}
+        assert self.storage.get_all_zones(borough="A") == []
+
+    def test_get_all_zones_json_cached_until_write(self):
+        """Test that the zone list JSON is reused and rebuilt after writes."""
+        self.storage.create_zone(ZONE_1)
+        body = self.storage.get_all_zones_json()
+
+        assert self.storage.get_all_zones_json() is body
+        assert b'"zone_name":"Z1"' in body
+
+        self.storage.update_zone(
+            ZoneBase(id=1, borough="A", zone_name="Renamed", service_zone="S", active=True)
+        )
+
+        assert b'"zone_name":"Renamed"' in self.storage.get_all_zones_json()
+
+        self.storage.delete_zone(1)
+
+        assert self.storage.get_all_zones_json() == b"[]"
+
+    def test_zone_borough_is_interned_after_strip(self):
+        """Test that zones built from separate strings share one borough str."""
+        first = ZoneBase(
+            id=1, borough=" ".join(["Staten", "Island "]), zone_name="Z", service_zone="S"
+        )
+        second = ZoneBase(
+            id=2, borough="".join(["Staten ", "Island"]), zone_name="Z", service_zone="S"
+        )
+
+        assert first.borough == "Staten Island"
+        assert first.borough is second.borough
+
+    def test_stored_zone_is_immutable(self):
+        """Test that a stored zone can't be modified without update_zone."""
+        zone = ZONE_1
+        self.storage.create_zone(zone)
+
+        with pytest.raises(ValidationError):
+            self.storage.get_zone(1).active = False
+
+        assert self.storage.get_all_zones(active=True) == [zone]
+
     def test_update_zone_success(self):
         """Test updating a zone successfully."""
-        zone = ZoneBase(id=1, borough="A", zone_name="Z", service_zone="S", active=True)
+        zone = ZONE_1
         self.storage.create_zone(zone)
 
         updated_zone = ZoneBase(id=1, borough="B", zone_name="Updated", service_zone="S", active=False)
@@ -110,9 +254,16 @@ class TestStorage:
         result = self.storage.get_zone(1)
         assert result == updated_zone
 
+    def test_update_zone_not_exists(self):
+        """Test updating a non-existing zone stores nothing."""
+        zone = ZoneBase(id=999, borough="A", zone_name="Z", service_zone="S", active=True)
+
+        assert self.storage.update_zone(zone) is False
+        assert not self.storage.zone_exists(999)
+
     def test_delete_zone_success(self):
         """Test deleting an existing zone."""
-        zone = ZoneBase(id=1, borough="A", zone_name="Z", service_zone="S", active=True)
+        zone = ZONE_1
         self.storage.create_zone(zone)
 
         result = self.storage.delete_zone(1)
@@ -126,7 +277,7 @@ class TestStorage:
 
     def test_zone_exists(self):
         """Test checking if zone exists."""
-        zone = ZoneBase(id=1, borough="A", zone_name="Z", service_zone="S", active=True)
+        zone = ZONE_1
         self.storage.create_zone(zone)
 
         assert self.storage.zone_exists(1) is True
@@ -136,30 +287,30 @@ class TestStorage:
     def test_create_route_success(self):
         """Test creating a route successfully."""
         # First create zones
-        zone1 = ZoneBase(id=1, borough="A", zone_name="Z1", service_zone="S", active=True)
-        zone2 = ZoneBase(id=2, borough="B", zone_name="Z2", service_zone="S", active=True)
+        zone1 = ZONE_1
+        zone2 = ZONE_2
         self.storage.create_zone(zone1)
         self.storage.create_zone(zone2)
 
-        route = RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=2, name="Route 1-2", active=True)
+        route = ROUTE_1_2
         self.storage.create_route(route)
 
         assert 1 in self.storage._routes_db
         assert self.storage._routes_db[1] == route
 
     def test_create_route_same_pickup_dropoff(self):
-        """Test creating route with same pickup and dropoff raises ValueError."""
+        """Test creating route with same pickup and dropoff raises ValidationError."""
         # Note: This validation now happens at the schema level, not storage level
-        zone1 = ZoneBase(id=1, borough="A", zone_name="Z1", service_zone="S", active=True)
+        zone1 = ZONE_1
         self.storage.create_zone(zone1)
 
         # This should fail at schema validation
-        with pytest.raises(Exception):  # Could be ValidationError from Pydantic
-            route = RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=1, name="Invalid", active=True)
+        with pytest.raises(ValidationError, match="pickup_zone_id and dropoff_zone_id"):
+            RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=1, name="Invalid", active=True)
 
     def test_create_route_missing_zone(self):
         """Test creating route with non-existing zone raises ValueError."""
-        zone1 = ZoneBase(id=1, borough="A", zone_name="Z1", service_zone="S", active=True)
+        zone1 = ZONE_1
         self.storage.create_zone(zone1)
 
         route = RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=999, name="Invalid", active=True)
@@ -167,26 +318,48 @@ class TestStorage:
         with pytest.raises(ValueError, match="dropoff_zone_id not in zones"):
             self.storage.create_route(route)
 
-    def test_get_route_exists(self):
+    def test_create_routes_success(self):
+        """Test creating several routes at once."""
+        self.storage.create_zones([
+            ZONE_1,
+            ZONE_2,
+        ])
+        routes = [
+            ROUTE_1_2,
+            RouteBase(id=2, pickup_zone_id=2, dropoff_zone_id=1, name="Route 2-1", active=True),
+        ]
+
+        self.storage.create_routes(routes)
+
+        assert self.storage.get_all_routes() == routes
+
+    def test_create_routes_missing_zone_creates_nothing(self):
+        """Test that one invalid route in a batch raises and stores no routes."""
+        self.storage.create_zones([
+            ZONE_1,
+            ZONE_2,
+        ])
+        routes = [
+            ROUTE_1_2,
+            RouteBase(id=2, pickup_zone_id=999, dropoff_zone_id=1, name="Invalid", active=True),
+        ]
+
+        with pytest.raises(ValueError, match="pickup_zone_id not in zones"):
+            self.storage.create_routes(routes)
+
+        assert not self.storage.route_exists(1)
+
+    def test_get_route_exists(self, stored_route):
         """Test getting an existing route."""
-        # Setup zones and route
-        zone1 = ZoneBase(id=1, borough="A", zone_name="Z1", service_zone="S", active=True)
-        zone2 = ZoneBase(id=2, borough="B", zone_name="Z2", service_zone="S", active=True)
-        self.storage.create_zone(zone1)
-        self.storage.create_zone(zone2)
-
-        route = RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=2, name="Route 1-2", active=True)
-        self.storage.create_route(route)
-
         result = self.storage.get_route(1)
-        assert result == route
+        assert result == stored_route
 
     def test_get_all_routes_with_filters(self):
         """Test getting all routes with filters."""
         # Setup zones
-        zone1 = ZoneBase(id=1, borough="A", zone_name="Z1", service_zone="S", active=True)
-        zone2 = ZoneBase(id=2, borough="B", zone_name="Z2", service_zone="S", active=True)
-        zone3 = ZoneBase(id=3, borough="C", zone_name="Z3", service_zone="S", active=True)
+        zone1 = ZONE_1
+        zone2 = ZONE_2
+        zone3 = ZONE_3
         self.storage.create_zone(zone1)
         self.storage.create_zone(zone2)
         self.storage.create_zone(zone3)
@@ -201,67 +374,109 @@ class TestStorage:
 
         # Test active filter
         result = self.storage.get_all_routes(active=True)
-        assert len(result) == 2
-        assert route1 in result
-        assert route3 in result
+        assert {route.id for route in result} == {1, 3}
 
         # Test pickup_zone_id filter
         result = self.storage.get_all_routes(pickup_zone_id=1)
-        assert len(result) == 2
-        assert route1 in result
-        assert route2 in result
+        assert {route.id for route in result} == {1, 2}
 
         # Test dropoff_zone_id filter
         result = self.storage.get_all_routes(dropoff_zone_id=3)
-        assert len(result) == 2
-        assert route2 in result
-        assert route3 in result
+        assert {route.id for route in result} == {2, 3}
+
+    def test_get_all_routes_filters_follow_updates(self):
+        """Test that route filters track updates, deletes and creation order."""
+        self.storage.create_zones([
+            ZoneBase(id=i, borough="A", zone_name=f"Z{i}", service_zone="S", active=True)
+            for i in (1, 2, 3)
+        ])
+        self.storage.create_routes([
+            RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=2, name="R1", active=True),
+            RouteBase(id=2, pickup_zone_id=1, dropoff_zone_id=3, name="R2", active=True),
+            RouteBase(id=3, pickup_zone_id=2, dropoff_zone_id=3, name="R3", active=True),
+        ])
+
+        self.storage.update_route(
+            1, RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=3, name="R1", active=False)
+        )
+        self.storage.delete_route(3)
 
-    def test_find_route_by_zones(self):
+        assert [r.id for r in self.storage.get_all_routes(dropoff_zone_id=3)] == [1, 2]
+        assert [r.id for r in self.storage.get_all_routes(active=True, pickup_zone_id=1)] == [2]
+        assert self.storage.get_all_routes(dropoff_zone_id=2) == []
+
+    def test_route_indexes_drop_emptied_zones(self):
+        """Test that deleting the last route of a zone removes its index entries."""
+        self.storage.create_zones([ZONE_1, ZONE_2])
+        self.storage.create_route(ROUTE_1_2)
+
+        self.storage.delete_route(1)
+
+        assert not self.storage._routes_by_pickup
+        assert not self.storage._routes_by_dropoff
+        assert not self.storage._routes_by_pair
+        assert self.storage.get_all_routes(pickup_zone_id=1) == []
+
+    def test_find_route_by_zones(self, populated_storage):
         """Test finding route by pickup and dropoff zones."""
-        # Setup zones and route
-        zone1 = ZoneBase(id=1, borough="A", zone_name="Z1", service_zone="S", active=True)
-        zone2 = ZoneBase(id=2, borough="B", zone_name="Z2", service_zone="S", active=True)
-        self.storage.create_zone(zone1)
-        self.storage.create_zone(zone2)
+        result = populated_storage.find_route_by_zones(1, 2)
+        assert result == ROUTE_1_2
 
-        route = RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=2, name="Route 1-2", active=True)
+        result = populated_storage.find_route_by_zones(2, 1)
+        assert result is None
+
+    def test_find_route_by_zones_follows_update_and_delete(self):
+        """Test that the zone pair lookup tracks route updates and deletes."""
+        self.storage.create_zones([
+            ZONE_1,
+            ZONE_2,
+            ZONE_3,
+        ])
+        route = ROUTE_1_2
         self.storage.create_route(route)
 
-        result = self.storage.find_route_by_zones(1, 2)
-        assert result == route
+        moved = RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=3, name="Route 1-3", active=True)
+        self.storage.update_route(1, moved)
 
-        result = self.storage.find_route_by_zones(2, 1)
-        assert result is None
+        assert self.storage.find_route_by_zones(1, 2) is None
+        assert self.storage.find_route_by_zones(1, 3) == moved
 
-    def test_update_route_success(self):
-        """Test updating a route successfully."""
-        # Setup zones and route
-        zone1 = ZoneBase(id=1, borough="A", zone_name="Z1", service_zone="S", active=True)
-        zone2 = ZoneBase(id=2, borough="B", zone_name="Z2", service_zone="S", active=True)
-        self.storage.create_zone(zone1)
-        self.storage.create_zone(zone2)
+        self.storage.delete_route(1)
 
-        route = RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=2, name="Original", active=True)
-        self.storage.create_route(route)
+        assert self.storage.find_route_by_zones(1, 3) is None
+
+    def test_find_route_by_zones_returns_oldest_after_move_back(self):
+        """Test that a route moved away and back is still found before newer ones."""
+        self.storage.create_zones([
+            ZoneBase(id=1, borough="A", zone_name="Z1", service_zone="S"),
+            ZoneBase(id=2, borough="B", zone_name="Z2", service_zone="S"),
+            ZoneBase(id=3, borough="C", zone_name="Z3", service_zone="S"),
+        ])
+        self.storage.create_routes([
+            RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=2, name="First"),
+            RouteBase(id=2, pickup_zone_id=1, dropoff_zone_id=2, name="Second"),
+        ])
+
+        self.storage.update_route(
+            1, RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=3, name="First")
+        )
+        self.storage.update_route(
+            1, RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=2, name="First")
+        )
 
+        assert self.storage.find_route_by_zones(1, 2).id == 1
+        assert self.storage.get_all_routes()[0].id == 1
+
+    def test_update_route_success(self, stored_route):
+        """Test updating a route successfully."""
         updated_route = RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=2, name="Updated", active=False)
         self.storage.update_route(1, updated_route)
 
         result = self.storage.get_route(1)
         assert result == updated_route
 
-    def test_delete_route_success(self):
+    def test_delete_route_success(self, stored_route):
         """Test deleting a route successfully."""
-        # Setup zones and route
-        zone1 = ZoneBase(id=1, borough="A", zone_name="Z1", service_zone="S", active=True)
-        zone2 = ZoneBase(id=2, borough="B", zone_name="Z2", service_zone="S", active=True)
-        self.storage.create_zone(zone1)
-        self.storage.create_zone(zone2)
-
-        route = RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=2, name="Route", active=True)
-        self.storage.create_route(route)
-
         result = self.storage.delete_route(1)
         assert result is True
         assert 1 not in self.storage._routes_db
@@ -269,7 +484,7 @@ class TestStorage:
     def test_clear_all(self):
         """Test clearing all data."""
         # Setup some data
-        zone = ZoneBase(id=1, borough="A", zone_name="Z", service_zone="S", active=True)
+        zone = ZONE_1
         self.storage.create_zone(zone)
 
         self.storage.clear_all()
@@ -277,24 +492,9 @@ class TestStorage:
         assert len(self.storage._zones_db) == 0
         assert len(self.storage._routes_db) == 0
 
-    def test_get_storage_stats(self):
+    def test_get_storage_stats(self, populated_storage):
         """Test getting storage statistics."""
-        # Setup some data
-        zone1 = ZoneBase(id=1, borough="A", zone_name="Z1", service_zone="S", active=True)
-        zone2 = ZoneBase(id=2, borough="B", zone_name="Z2", service_zone="S", active=True)
-        self.storage.create_zone(zone1)
-        self.storage.create_zone(zone2)
-
-        zone3 = ZoneBase(id=3, borough="C", zone_name="Z3", service_zone="S", active=True)
-        self.storage.create_zone(zone3)
-
-        # Setup routes
-        route1 = RouteBase(id=1, pickup_zone_id=1, dropoff_zone_id=2, name="R1", active=True)
-        route2 = RouteBase(id=2, pickup_zone_id=2, dropoff_zone_id=3, name="R2", active=True)
-        self.storage.create_route(route1)
-        self.storage.create_route(route2)
-
-        stats = self.storage.get_storage_stats()
+        stats = populated_storage.get_storage_stats()
         assert stats["zones_count"] == 3
         assert stats["routes_count"] == 2
 
@@ -305,4 +505,21 @@ class TestStorage:
 
         assert id1 == 1
         assert id2 == 2
-        assert self.storage._id_counter == 2
\ No newline at end of file
+        assert self.storage._id_counter == 2
+
+    def test_reserve_route_ids(self):
+        """Test reserving a block of route IDs."""
+        self.storage.assign_route_id()
+
+        ids = self.storage.reserve_route_ids(3)
+
+        assert list(ids) == [2, 3, 4]
+        assert self.storage.assign_route_id() == 5
+
+    def test_reserve_route_ids_concurrent(self):
+        """Test that concurrent reservations never hand out the same ID."""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            blocks = list(pool.map(self.storage.reserve_route_ids, [5] * 200))
+
+        ids = [route_id for block in blocks for route_id in block]
+        assert sorted(ids) == list(range(1, 1001))
\ No newline at end of file
@@ -20,9 +20,15 @@
             streamlit
             pandas
             pyarrow
+            numba
             uvicorn
+            uvloop
+            httptools
             requests
+            requests-toolbelt
+            orjson
             pytest
+            pytest-xdist
             httpx
           ]);
       in {
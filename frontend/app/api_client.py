@@ -6,11 +6,30 @@ reuse the same configuration and error handling.
 
 from __future__ import annotations
 
+import functools
 import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, BinaryIO
 
+import orjson
 import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from requests_toolbelt import MultipartEncoder
+from urllib3.util.retry import Retry
+
+# Reads are cached per argument set so Streamlit reruns (every widget change)
+# reuse the last response; each write below clears the caches it affects.
+_cache_reads = st.cache_data(ttl=30, max_entries=64, show_spinner=False)
+
+# Last ETag and parsed body per GET url and params, so a read whose cache
+# entry expired can be revalidated with If-None-Match instead of re-downloaded
+_ETAG_CACHE_SIZE = 128
+_EtagKey = tuple[str, tuple[tuple[str, Any], ...]]
+_etags: OrderedDict[_EtagKey, tuple[str, Any]] = OrderedDict()
+_etags_lock = threading.Lock()
 
 
 @dataclass(frozen=True)
@@ -24,16 +43,41 @@ class ApiError(Exception):
         return f"API error {self.status_code}: {self.detail}"
 
 
+@functools.lru_cache(maxsize=1)
 def get_api_url() -> str:
     """Return the base URL for the backend API.
 
     Reads the value from the API_URL environment variable, defaulting to
-    http://localhost:8000 for local development.
+    http://localhost:8000 for local development. The variable is read once
+    per process; changing it requires restarting Streamlit.
     """
 
     return os.getenv("API_URL", "http://localhost:8000").rstrip("/")
 
 
+@st.cache_resource
+def _session() -> requests.Session:
+    """Return the HTTP session shared by every page and rerun.
+
+    Reusing one session keeps backend connections alive between calls
+    instead of opening a new one per request. Idempotent requests are
+    retried briefly when the backend answers 502/503/504; if that status
+    persists, the last response is returned and surfaces as ApiError.
+    """
+
+    retry = Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 def _request(
     method: str,
     path: str,
@@ -44,6 +88,9 @@ def _request(
 ) -> Any:
     """Perform an HTTP request to the backend API.
 
+    GET responses that carry an ETag are remembered; repeating the same GET
+    sends If-None-Match and reuses the remembered body on a 304.
+
     Args:
         method: HTTP method.
         path: API path, starting with '/'.
@@ -62,33 +109,81 @@ def _request(
     base_url = get_api_url()
     url = f"{base_url}{path}"
 
-    response = requests.request(
+    # Encoded with orjson rather than letting requests run json.dumps
+    data: bytes | None = None
+    headers: dict[str, str] = {}
+    if json is not None:
+        data = orjson.dumps(json)
+        headers["Content-Type"] = "application/json"
+
+    etag_key = None
+    cached: tuple[str, Any] | None = None
+    if method == "GET":
+        etag_key = (url, tuple(sorted((params or {}).items())))
+        with _etags_lock:
+            cached = _etags.get(etag_key)
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+
+    response = _session().request(
         method=method,
         url=url,
         params=params,
-        json=json,
+        data=data,
+        headers=headers,
         timeout=timeout_seconds,
     )
 
+    if response.status_code == 304 and cached is not None:
+        with _etags_lock:
+            if etag_key in _etags:
+                _etags.move_to_end(etag_key)
+        return cached[1]
+
     if response.ok:
         if not response.content:
             return None
-        return response.json()
+        body = orjson.loads(response.content)
+        etag = response.headers.get("ETag")
+        if etag_key is not None and etag:
+            with _etags_lock:
+                _etags[etag_key] = (etag, body)
+                _etags.move_to_end(etag_key)
+                if len(_etags) > _ETAG_CACHE_SIZE:
+                    _etags.popitem(last=False)
+        return body
 
     try:
-        detail: Any = response.json().get("detail")
+        detail: Any = orjson.loads(response.content).get("detail")
     except Exception:  # noqa: BLE001
         detail = response.text
 
     raise ApiError(status_code=response.status_code, detail=detail)
 
 
+def _clear_zone_cache() -> None:
+    """Drop cached zone reads after a zone write."""
+
+    list_zones.clear()
+    get_zone.clear()
+    zone_store.clear()
+
+
+def _clear_route_cache() -> None:
+    """Drop cached route reads after a route write."""
+
+    list_routes.clear()
+    get_route.clear()
+
+
+@st.cache_data(ttl=5, show_spinner=False)
 def get_health() -> dict[str, Any]:
     """Call the /health endpoint and return its JSON response."""
 
     return _request("GET", "/health", timeout_seconds=5)
 
 
+@_cache_reads
 def list_zones(
     *,
     active: bool | None = None,
@@ -104,30 +199,49 @@ def list_zones(
     return _request("GET", "/zones", params=params)
 
 
+@_cache_reads
 def get_zone(zone_id: int) -> dict[str, Any]:
     """Get a zone by id."""
 
     return _request("GET", f"/zones/{zone_id}")
 
 
+@st.cache_resource(ttl=30, show_spinner=False)
+def zone_store() -> dict[int, dict[str, Any]]:
+    """Return every zone keyed by id, shared by all pages and sessions.
+
+    Unlike the cached reads above, every caller gets the same dict rather
+    than a copy, so it must be treated as read-only. Zone writes drop it
+    together with the other zone reads.
+    """
+
+    return {int(zone["id"]): zone for zone in list_zones()}
+
+
 def create_zone(payload: dict[str, Any]) -> dict[str, Any]:
     """Create a zone."""
 
-    return _request("POST", "/zones", json=payload)
+    created = _request("POST", "/zones", json=payload)
+    _clear_zone_cache()
+    return created
 
 
 def update_zone(zone_id: int, payload: dict[str, Any]) -> dict[str, Any]:
     """Update a zone by id."""
 
-    return _request("PUT", f"/zones/{zone_id}", json=payload)
+    updated = _request("PUT", f"/zones/{zone_id}", json=payload)
+    _clear_zone_cache()
+    return updated
 
 
 def delete_zone(zone_id: int) -> None:
     """Delete a zone by id."""
 
     _request("DELETE", f"/zones/{zone_id}")
+    _clear_zone_cache()
 
 
+@_cache_reads
 def list_routes(
     *,
     active: bool | None = None,
@@ -146,6 +260,7 @@ def list_routes(
     return _request("GET", "/routes", params=params)
 
 
+@_cache_reads
 def get_route(route_id: int) -> dict[str, Any]:
     """Get a route by id."""
 
@@ -155,25 +270,30 @@ def get_route(route_id: int) -> dict[str, Any]:
 def create_route(payload: dict[str, Any]) -> dict[str, Any]:
     """Create a route."""
 
-    return _request("POST", "/routes", json=payload)
+    created = _request("POST", "/routes", json=payload)
+    _clear_route_cache()
+    return created
 
 
 def update_route(route_id: int, payload: dict[str, Any]) -> dict[str, Any]:
     """Update a route by id."""
 
-    return _request("PUT", f"/routes/{route_id}", json=payload)
+    updated = _request("PUT", f"/routes/{route_id}", json=payload)
+    _clear_route_cache()
+    return updated
 
 
 def delete_route(route_id: int) -> None:
     """Delete a route by id."""
 
     _request("DELETE", f"/routes/{route_id}")
+    _clear_route_cache()
 
 
 def upload_trips_parquet(
     *,
     filename: str,
-    content: bytes,
+    file_obj: BinaryIO,
     mode: str,
     limit_rows: int = 50000,
     top_n_routes: int = 50,
@@ -181,11 +301,13 @@ def upload_trips_parquet(
 ) -> dict[str, Any]:
     """Upload and process a parquet file.
 
-    Calls POST /uploads/trips-parquet using multipart/form-data.
+    Calls POST /uploads/trips-parquet using multipart/form-data. The body is
+    streamed from file_obj in chunks, so the file is never copied into a
+    second in-memory request body.
 
     Args:
         filename: Name of the parquet file.
-        content: Raw parquet bytes.
+        file_obj: Binary file object positioned at the start of the parquet data.
         mode: Processing mode ('create' or 'update').
         limit_rows: Maximum rows to process.
         top_n_routes: Top N routes to extract.
@@ -202,31 +324,34 @@ def upload_trips_parquet(
     base_url = get_api_url()
     url = f"{base_url}/uploads/trips-parquet"
 
-    files = {
-        "file": (
-            filename,
-            content,
-            "application/octet-stream",
-        )
-    }
-    data = {
-        "mode": mode,
-        "limit_rows": str(limit_rows),
-        "top_n_routes": str(top_n_routes),
-    }
-
-    response = requests.post(
+    encoder = MultipartEncoder(
+        fields={
+            "file": (
+                filename,
+                file_obj,
+                "application/octet-stream",
+            ),
+            "mode": mode,
+            "limit_rows": str(limit_rows),
+            "top_n_routes": str(top_n_routes),
+        }
+    )
+
+    response = _session().post(
         url=url,
-        files=files,
-        data=data,
+        data=encoder,
+        headers={"Content-Type": encoder.content_type},
         timeout=timeout_seconds,
     )
 
     if response.ok:
-        return response.json()
+        # The upload creates and updates both zones and routes
+        _clear_zone_cache()
+        _clear_route_cache()
+        return orjson.loads(response.content)
 
     try:
-        detail: Any = response.json().get("detail")
+        detail: Any = orjson.loads(response.content).get("detail")
     except Exception:  # noqa: BLE001
         detail = response.text
 
@@ -6,10 +6,10 @@ backend.
 
 from __future__ import annotations
 
+import functools
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-import pandas as pd
 import streamlit as st
 
 from api_client import (
@@ -21,6 +21,9 @@ from api_client import (
 	update_zone,
 )
 
+if TYPE_CHECKING:
+	import pandas as pd
+
 
 def _format_api_error(err: ApiError) -> str:
 	detail = err.detail
@@ -30,22 +33,43 @@ def _format_api_error(err: ApiError) -> str:
 	return str(detail)
 
 
+_ZONE_COLUMNS = (
+	"id",
+	"borough",
+	"zone_name",
+	"service_zone",
+	"active",
+	"created_at",
+)
+
+# Typed once so the table doesn't infer each column's type on every render
+_ZONE_COLUMN_CONFIG = {
+	"id": st.column_config.NumberColumn("id", format="%d"),
+	"active": st.column_config.CheckboxColumn("active"),
+}
+
+
+# The backend schema is stable, so the order is computed once per column set
+@functools.lru_cache(maxsize=8)
+def _column_order(columns: tuple[str, ...], preferred: tuple[str, ...]) -> tuple[str, ...]:
+	return tuple(c for c in preferred if c in columns) + tuple(
+		c for c in columns if c not in preferred
+	)
+
+
 def _zones_to_dataframe(zones: list[dict[str, Any]]) -> pd.DataFrame:
+	# Imported here so the forms render before pandas is loaded
+	import pandas as pd
+
 	if not zones:
 		return pd.DataFrame()
-	dataframe = pd.DataFrame(zones)
-	preferred_order = [
-		"id",
-		"borough",
-		"zone_name",
-		"service_zone",
-		"active",
-		"created_at",
-	]
-	columns = [c for c in preferred_order if c in dataframe.columns] + [
-		c for c in dataframe.columns if c not in preferred_order
-	]
-	return dataframe[columns]
+	dataframe = pd.DataFrame.from_records(zones)
+	# Boroughs and service zones repeat across rows; store each string once
+	dataframe = dataframe.astype(
+		{c: "category" for c in ("borough", "service_zone") if c in dataframe.columns}
+	)
+	columns = _column_order(tuple(dataframe.columns), _ZONE_COLUMNS)
+	return dataframe[list(columns)]
 
 
 def _parse_created_at(value: Any) -> datetime | None:
@@ -54,8 +78,11 @@ def _parse_created_at(value: Any) -> datetime | None:
 	if isinstance(value, datetime):
 		return value
 	if isinstance(value, str):
+		# fromisoformat only accepts a trailing "Z" from Python 3.11
+		if value.endswith("Z"):
+			value = value[:-1] + "+00:00"
 		try:
-			return datetime.fromisoformat(value.replace("Z", "+00:00"))
+			return datetime.fromisoformat(value)
 		except ValueError:
 			return None
 	return None
@@ -67,20 +94,24 @@ def main() -> None:
 
 	st.caption("CRUD de zonas (LocationID) consumiendo el backend vía HTTP.")
 
+	# Filters only take effect on "Aplicar", so typing in them doesn't
+	# rerun the page and refetch the list on every change
 	with st.expander("Filtros", expanded=True):
-		active_filter_enabled = st.checkbox("Filtrar por active", value=False)
-		active_value = st.selectbox(
-			"active",
-			options=[True, False],
-			disabled=not active_filter_enabled,
-		)
-		borough = st.text_input("borough (opcional)", placeholder="Ej: Manhattan")
-
-		filters: dict[str, Any] = {}
-		if active_filter_enabled:
-			filters["active"] = active_value
-		if borough.strip():
-			filters["borough"] = borough.strip()
+		with st.form("zone_filters"):
+			active_filter_enabled = st.checkbox("Filtrar por active", value=False)
+			active_value = st.selectbox("active", options=[True, False])
+			borough = st.text_input("borough (opcional)", placeholder="Ej: Manhattan")
+			apply = st.form_submit_button("Aplicar")
+
+		if apply:
+			applied: dict[str, Any] = {}
+			if active_filter_enabled:
+				applied["active"] = active_value
+			if borough.strip():
+				applied["borough"] = borough.strip()
+			st.session_state["zone_filters"] = applied
+
+	filters: dict[str, Any] = st.session_state.get("zone_filters", {})
 
 	st.markdown("---")
 
@@ -209,7 +240,12 @@ def main() -> None:
 		if df.empty:
 			st.info("No hay zonas para mostrar con los filtros actuales.")
 		else:
-			st.dataframe(df, width="stretch", hide_index=True)
+			st.dataframe(
+				df,
+				width="stretch",
+				hide_index=True,
+				column_config=_ZONE_COLUMN_CONFIG,
+			)
 	except ApiError as err:
 		st.error(_format_api_error(err))
 	except Exception as exc:  # noqa: BLE001
@@ -6,10 +6,11 @@ backend.
 
 from __future__ import annotations
 
+import functools
+from collections.abc import Iterable
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-import pandas as pd
 import streamlit as st
 
 from api_client import (
@@ -18,10 +19,13 @@ from api_client import (
 	delete_route,
 	get_route,
 	list_routes,
-	list_zones,
 	update_route,
+	zone_store,
 )
 
+if TYPE_CHECKING:
+	import pandas as pd
+
 
 def _format_api_error(err: ApiError) -> str:
 	detail = err.detail
@@ -36,54 +40,69 @@ def _parse_created_at(value: Any) -> datetime | None:
 	if isinstance(value, datetime):
 		return value
 	if isinstance(value, str):
+		# fromisoformat only accepts a trailing "Z" from Python 3.11
+		if value.endswith("Z"):
+			value = value[:-1] + "+00:00"
 		try:
-			return datetime.fromisoformat(value.replace("Z", "+00:00"))
+			return datetime.fromisoformat(value)
 		except ValueError:
 			return None
 	return None
 
 
+_ROUTE_COLUMNS = (
+	"id",
+	"name",
+	"active",
+	"pickup_zone_id",
+	"pickup_zone",
+	"dropoff_zone_id",
+	"dropoff_zone",
+	"created_at",
+)
+
+# Typed once so the table doesn't infer each column's type on every render
+_ROUTE_COLUMN_CONFIG = {
+	"id": st.column_config.NumberColumn("id", format="%d"),
+	"active": st.column_config.CheckboxColumn("active"),
+	"pickup_zone_id": st.column_config.NumberColumn("pickup_zone_id", format="%d"),
+	"dropoff_zone_id": st.column_config.NumberColumn("dropoff_zone_id", format="%d"),
+}
+
+
+# The backend schema is stable, so the order is computed once per column set
+@functools.lru_cache(maxsize=8)
+def _column_order(columns: tuple[str, ...], preferred: tuple[str, ...]) -> tuple[str, ...]:
+	return tuple(c for c in preferred if c in columns) + tuple(
+		c for c in columns if c not in preferred
+	)
+
+
 def _routes_to_dataframe(
 	routes: list[dict[str, Any]],
 	*,
 	zones_by_id: dict[int, dict[str, Any]] | None = None,
 ) -> pd.DataFrame:
+	# Imported here so the forms render before pandas is loaded
+	import pandas as pd
+
 	if not routes:
 		return pd.DataFrame()
 
-	enriched: list[dict[str, Any]] = []
-	zones_by_id = zones_by_id or {}
-	for route in routes:
-		pickup_id = int(route.get("pickup_zone_id", 0) or 0)
-		dropoff_id = int(route.get("dropoff_zone_id", 0) or 0)
-		pickup_zone = zones_by_id.get(pickup_id, {})
-		dropoff_zone = zones_by_id.get(dropoff_id, {})
-		enriched.append(
-			{
-				**route,
-				"pickup_zone": pickup_zone.get("zone_name"),
-				"dropoff_zone": dropoff_zone.get("zone_name"),
-			}
-		)
+	dataframe = pd.DataFrame.from_records(routes)
+	# Zone names indexed by id, looked up for both columns at once; a zone
+	# name repeats over every route touching it, so store each string once
+	zone_names = pd.Series(
+		{zone_id: zone.get("zone_name") for zone_id, zone in (zones_by_id or {}).items()},
+		dtype=object,
+	)
+	dataframe["pickup_zone"] = dataframe["pickup_zone_id"].map(zone_names).astype("category")
+	dataframe["dropoff_zone"] = dataframe["dropoff_zone_id"].map(zone_names).astype("category")
+	columns = _column_order(tuple(dataframe.columns), _ROUTE_COLUMNS)
+	return dataframe[list(columns)]
+
 
-	dataframe = pd.DataFrame(enriched)
-	preferred_order = [
-		"id",
-		"name",
-		"active",
-		"pickup_zone_id",
-		"pickup_zone",
-		"dropoff_zone_id",
-		"dropoff_zone",
-		"created_at",
-	]
-	columns = [c for c in preferred_order if c in dataframe.columns] + [
-		c for c in dataframe.columns if c not in preferred_order
-	]
-	return dataframe[columns]
-
-
-def _build_zone_options(zones: list[dict[str, Any]]) -> list[tuple[int, str]]:
+def _build_zone_options(zones: Iterable[dict[str, Any]]) -> list[tuple[int, str]]:
 	options: list[tuple[int, str]] = []
 	for zone in zones:
 		zone_id = int(zone.get("id"))
@@ -95,6 +114,16 @@ def _build_zone_options(zones: list[dict[str, Any]]) -> list[tuple[int, str]]:
 	return options
 
 
+# Rebuilt per rerun from the shared zone store; caching it with
+# st.cache_data would hash every zone on each call instead
+def _zone_indices(
+	zones_by_id: dict[int, dict[str, Any]],
+) -> tuple[list[tuple[int, str]], dict[int, int]]:
+	zone_options = _build_zone_options(zones_by_id.values())
+	option_index = {zone_id: idx for idx, (zone_id, _) in enumerate(zone_options)}
+	return zone_options, option_index
+
+
 def _default_route_name(
 	pickup_zone_id: int,
 	dropoff_zone_id: int,
@@ -115,7 +144,7 @@ def main() -> None:
 	st.caption("CRUD de rutas (pickup/dropoff) consumiendo el backend vía HTTP.")
 
 	try:
-		zones = list_zones()
+		zones_by_id = zone_store()
 	except ApiError as err:
 		st.error(_format_api_error(err))
 		st.stop()
@@ -126,56 +155,52 @@ def main() -> None:
 		)
 		st.stop()
 
-	zones_by_id: dict[int, dict[str, Any]] = {}
-	for zone in zones:
-		try:
-			zones_by_id[int(zone.get("id"))] = zone
-		except Exception:  # noqa: BLE001
-			continue
-
-	zone_options = _build_zone_options(zones)
+	zone_options, option_index = _zone_indices(zones_by_id)
 	if not zone_options:
 		st.warning("No hay zonas cargadas. Crea Zones primero para poder crear Routes.")
 
+	# Filters only take effect on "Aplicar", so changing them doesn't
+	# rerun the page and refetch the list on every change
 	with st.expander("Filtros", expanded=True):
-		active_filter_enabled = st.checkbox("Filtrar por active", value=False)
-		active_value = st.selectbox(
-			"active",
-			options=[True, False],
-			disabled=not active_filter_enabled,
-		)
+		with st.form("route_filters"):
+			active_filter_enabled = st.checkbox("Filtrar por active", value=False)
+			active_value = st.selectbox("active", options=[True, False])
 
-		if zone_options:
-			pickup_filter_enabled = st.checkbox("Filtrar por pickup_zone_id", value=False)
-			pickup_filter = st.selectbox(
-				"pickup_zone_id",
-				options=zone_options,
-				format_func=lambda o: o[1],
-				disabled=not pickup_filter_enabled,
-			)
+			if zone_options:
+				pickup_filter_enabled = st.checkbox("Filtrar por pickup_zone_id", value=False)
+				pickup_filter = st.selectbox(
+					"pickup_zone_id",
+					options=zone_options,
+					format_func=lambda o: o[1],
+				)
 
-			dropoff_filter_enabled = st.checkbox("Filtrar por dropoff_zone_id", value=False)
-			dropoff_filter = st.selectbox(
-				"dropoff_zone_id",
-				options=zone_options,
-				format_func=lambda o: o[1],
-				disabled=not dropoff_filter_enabled,
-			)
-		else:
-			pickup_filter_enabled = False
-			dropoff_filter_enabled = False
-			st.info(
-				"No hay zonas disponibles para filtrar por pickup/dropoff. "
-				"Crea Zonas primero para poder usar estos filtros."
-			)
+				dropoff_filter_enabled = st.checkbox("Filtrar por dropoff_zone_id", value=False)
+				dropoff_filter = st.selectbox(
+					"dropoff_zone_id",
+					options=zone_options,
+					format_func=lambda o: o[1],
+				)
+			else:
+				pickup_filter_enabled = False
+				dropoff_filter_enabled = False
+				st.info(
+					"No hay zonas disponibles para filtrar por pickup/dropoff. "
+					"Crea Zonas primero para poder usar estos filtros."
+				)
+
+			apply = st.form_submit_button("Aplicar")
 
-		filters: dict[str, Any] = {}
-		if active_filter_enabled:
-			filters["active"] = active_value
-		if zone_options and pickup_filter_enabled:
-			filters["pickup_zone_id"] = int(pickup_filter[0])
-		if zone_options and dropoff_filter_enabled:
-			filters["dropoff_zone_id"] = int(dropoff_filter[0])
+		if apply:
+			applied: dict[str, Any] = {}
+			if active_filter_enabled:
+				applied["active"] = active_value
+			if zone_options and pickup_filter_enabled:
+				applied["pickup_zone_id"] = int(pickup_filter[0])
+			if zone_options and dropoff_filter_enabled:
+				applied["dropoff_zone_id"] = int(dropoff_filter[0])
+			st.session_state["route_filters"] = applied
+
+	filters: dict[str, Any] = st.session_state.get("route_filters", {})
 
 	st.markdown("---")
 
@@ -264,13 +289,8 @@ def main() -> None:
 					current_pickup_id = int(loaded_route.get("pickup_zone_id", 0) or 0)
 					current_dropoff_id = int(loaded_route.get("dropoff_zone_id", 0) or 0)
 
-					pickup_index = 0
-					dropoff_index = 0
-					for idx, (zone_id, _) in enumerate(zone_options):
-						if zone_id == current_pickup_id:
-							pickup_index = idx
-						if zone_id == current_dropoff_id:
-							dropoff_index = idx
+					pickup_index = option_index.get(current_pickup_id, 0)
+					dropoff_index = option_index.get(current_dropoff_id, 0)
 
 					pickup_edit = st.selectbox(
 						"pickup_zone_id",
@@ -350,7 +370,12 @@ def main() -> None:
 		if df.empty:
 			st.info("No hay rutas para mostrar con los filtros actuales.")
 		else:
-			st.dataframe(df, width="stretch", hide_index=True)
+			st.dataframe(
+				df,
+				width="stretch",
+				hide_index=True,
+				column_config=_ROUTE_COLUMN_CONFIG,
+			)
 	except ApiError as err:
 		st.error(_format_api_error(err))
 	except Exception as exc:  # noqa: BLE001
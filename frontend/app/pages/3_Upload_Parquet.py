@@ -93,9 +93,10 @@ def main() -> None:
 	if st.button("Procesar parquet", disabled=process_disabled):
 		try:
 			with st.spinner("Subiendo y procesando archivo..."):
+				uploaded_file.seek(0)
 				result = upload_trips_parquet(
 					filename=str(uploaded_file.name),
-					content=uploaded_file.getvalue(),
+					file_obj=uploaded_file,
 					mode=str(mode),
 					limit_rows=int(limit_rows),
 					top_n_routes=int(top_n_routes),